@@ -96,3 +96,35 @@ def get_e_nfs_path(layout_name, dataset_name, filename, uuid):
     e_nfs_dir.mkdir(parents=True, exist_ok=True)
 
     return e_nfs_path
+
+
+def get_cache_path(cache_name, filename):
+    project_root_path = get_project_root_path()
+    cache_dir = project_root_path.joinpath("data/cache/").joinpath(cache_name)
+    cache_path = cache_dir.joinpath(filename)
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+
+    return cache_path
+
+
+def get_surrogate_path(layout_name, dataset_name, filename, uuid):
+    data_dir = get_data_dir(
+        layout_name=layout_name, dataset_name=dataset_name, uuid=uuid
+    )
+    surrogate_dir = data_dir.joinpath("surrogate/")
+    surrogate_path = surrogate_dir.joinpath(filename)
+
+    surrogate_dir.mkdir(parents=True, exist_ok=True)
+
+    return surrogate_path
+
+
+def get_benchmark_path(filename):
+    project_root_path = get_project_root_path()
+    benchmark_dir = project_root_path.joinpath("data/benchmarks/")
+    benchmark_path = benchmark_dir.joinpath(filename)
+
+    benchmark_dir.mkdir(parents=True, exist_ok=True)
+
+    return benchmark_path
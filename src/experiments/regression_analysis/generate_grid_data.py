@@ -56,18 +56,15 @@ NAME_ABBREVIATIONS = {
     "stress": "ST",
 }
 # First Party Library
-from utils.graph import load_nx_graph
-
-dataset_path = paths.get_dataset_path(dataset_name=DATASET_NAME)
-nx_graph = load_nx_graph(dataset_name=DATASET_NAME, edge_weight=EDGE_WEIGHT)
-# Third Party Library
-from egraph import warshall_floyd
-
-# First Party Library
-from generators.graph import egraph_graph
-
-eg_graph, eg_indices = egraph_graph(nx_graph=nx_graph)
-eg_distance_matrix = warshall_floyd(eg_graph, lambda _: EDGE_WEIGHT)
+from generators.graph import egraph_graph_from_bundle
+from utils import graph_bundle
+from utils.distance_matrix import egraph_distance_matrix
+
+bundle = graph_bundle.load(dataset_name=DATASET_NAME, edge_weight=EDGE_WEIGHT)
+eg_graph, eg_indices = egraph_graph_from_bundle(bundle=bundle)
+eg_distance_matrix = egraph_distance_matrix(
+    eg_graph=eg_graph, edge_weight=EDGE_WEIGHT
+)
 # Standard Library
 from itertools import product
 
@@ -107,6 +104,7 @@ from egraph import Coordinates, Rng, SparseSgd, crossing_edges
 
 # First Party Library
 from config.quality_metrics import ALL_QM_NAMES
+from utils import drawing
 from utils.quality_metrics import measure_qualities
 
 data = []
@@ -145,10 +143,7 @@ for params in tqdm(params_list):
         for qm_name in ALL_QM_NAMES:
             mean_quality_metrics[qm_name].append(quality_metrics[qm_name])
 
-        pos = {
-            u: (eg_drawing.x(i), eg_drawing.y(i))
-            for u, i in eg_indices.items()
-        }
+        pos = drawing.from_egraph(eg_drawing=eg_drawing, n=len(eg_indices))
         data_id = generate_data_id()
         data_object = {
             "data_id": data_id,
@@ -1,26 +1,232 @@
+# Third Party Library
+import numpy as np
+from egraph import Coordinates
+
 # First Party Library
+from config import quality_metrics
+from generators import graph as graph_generator
 from layouts import sgd
-from utils import quality_metrics
+from utils import (
+    distance_matrix,
+    drawing,
+    graph_bundle,
+    shared_arrays,
+    tracing,
+)
+from utils.quality_metrics import (
+    build_approximations,
+    build_backends,
+    measure_qualities_with_timings,
+)
+
+_worker_context = {}
+# shared memory blocks the arrays of the worker context are views into
+_worker_blocks = []
 
 
 def ss(
-    nx_graph,
     eg_graph,
     eg_indices,
+    eg_distance_matrix,
     params,
-    shortest_path_length,
     seed,
-    edge_weight,
+    sgd_backend,
+    edges=None,
+    adjacency=None,
+    distance_matrix=None,
+    stress_pivots=None,
+    crossing_relative_error=None,
+    metric_backend="egraph",
+    pivot_cache=False,
 ):
+    eg_drawing = Coordinates.initial_placement(eg_graph)
+
     pos = sgd.sgd(
-        eg_graph=eg_graph, eg_indices=eg_indices, params=params, seed=seed
+        eg_graph=eg_graph,
+        eg_indices=eg_indices,
+        eg_drawing=eg_drawing,
+        params=params,
+        seed=seed,
+        backend=sgd_backend,
+        edges=edges,
+        adjacency=adjacency,
+        pivot_cache=pivot_cache,
     )
 
-    qualities = quality_metrics.measure_qualities(
-        nx_graph=nx_graph,
-        pos=pos,
-        shortest_path_length=shortest_path_length,
-        edge_weight=edge_weight,
+    qualities, timings = measure_qualities_with_timings(
+        target_qm_names=quality_metrics.qm_names,
+        eg_graph=eg_graph,
+        eg_drawing=eg_drawing,
+        eg_distance_matrix=eg_distance_matrix,
+        edges=edges,
+        adjacency=adjacency,
+        distance_matrix=distance_matrix,
+        approximations=build_approximations(
+            seed=seed,
+            stress_pivots=stress_pivots,
+            crossing_relative_error=crossing_relative_error,
+        ),
+        backends=build_backends(metric_backend=metric_backend),
     )
 
-    return pos, qualities
+    return pos, qualities, timings
+
+
+def convergence(
+    eg_graph,
+    eg_indices,
+    eg_distance_matrix,
+    params,
+    seed,
+    sgd_backend,
+    steps,
+    schedule="prefix",
+    target_qm_names=quality_metrics.qm_names,
+    edges=None,
+    adjacency=None,
+    distance_matrix=None,
+    stress_pivots=None,
+    crossing_relative_error=None,
+    metric_backend="egraph",
+    pivot_cache=False,
+):
+    # qualities after each of the given steps of a single sgd run
+    eg_drawing = Coordinates.initial_placement(eg_graph)
+
+    snapshots = sgd.sgd_trace(
+        eg_graph=eg_graph,
+        eg_indices=eg_indices,
+        eg_drawing=eg_drawing,
+        params={**params, "number_of_iterations": max(steps)},
+        seed=seed,
+        steps=steps,
+        backend=sgd_backend,
+        schedule=schedule,
+        edges=edges,
+        adjacency=adjacency,
+        pivot_cache=pivot_cache,
+    )
+
+    curve = []
+    for step, pos in snapshots:
+        drawing.to_egraph(pos=pos, eg_drawing=eg_drawing)
+        qualities, timings = measure_qualities_with_timings(
+            target_qm_names=target_qm_names,
+            eg_graph=eg_graph,
+            eg_drawing=eg_drawing,
+            eg_distance_matrix=eg_distance_matrix,
+            edges=edges,
+            adjacency=adjacency,
+            distance_matrix=distance_matrix,
+            pos=pos,
+            approximations=build_approximations(
+                seed=seed,
+                stress_pivots=stress_pivots,
+                crossing_relative_error=crossing_relative_error,
+            ),
+            backends=build_backends(metric_backend=metric_backend),
+        )
+        curve.append(
+            {
+                "step": step,
+                "pos": pos,
+                "qualities": qualities,
+                "timings": timings,
+            }
+        )
+
+    return curve
+
+
+def share_bundle(
+    bundle, edge_weight, stress_pivots=None, metric_backend="egraph"
+):
+    # the graph arrays are published once for every worker to attach to,
+    # and the distance matrix the numpy metrics read is written to its
+    # memory-mapped cache before any worker asks for it
+    if stress_pivots is None and metric_backend == "numpy":
+        distance_matrix.load_distance_matrix(
+            bundle=bundle, edge_weight=edge_weight
+        )
+
+    return shared_arrays.publish(bundle)
+
+
+def init_worker(
+    bundle,
+    edge_weight,
+    sgd_backend="egraph",
+    stress_pivots=None,
+    crossing_relative_error=None,
+    metric_backend="egraph",
+    shared=False,
+    pivot_cache=False,
+):
+    if shared:
+        # this is a pool worker, which must not report the spans of its
+        # parent as its own
+        tracing.reset()
+        # bundle is a handle from share_bundle, its arrays are read-only
+        # views into shared memory
+        bundle, blocks = shared_arrays.attach(bundle)
+        _worker_blocks.extend(blocks)
+
+    eg_graph, eg_indices = graph_generator.egraph_graph_from_bundle(
+        bundle=bundle
+    )
+    # the numpy sgd and metrics work on the bundle arrays, built once per
+    # worker instead of once per seed from eg_graph
+    edges = np.stack([bundle["sources"], bundle["targets"]], axis=1).astype(
+        np.int64
+    )
+    adjacency = None
+    eg_distance_matrix = None
+    cached_distance_matrix = None
+    if (
+        stress_pivots is not None
+        or sgd_backend == "numpy"
+        or metric_backend == "numpy"
+    ):
+        adjacency = graph_bundle.adjacency_matrix(bundle=bundle)
+    if stress_pivots is None:
+        if metric_backend == "numpy":
+            # every worker maps the same file, so the pages are shared
+            cached_distance_matrix = distance_matrix.load_distance_matrix(
+                bundle=bundle, edge_weight=edge_weight
+            )
+        else:
+            eg_distance_matrix = distance_matrix.egraph_distance_matrix(
+                eg_graph=eg_graph, edge_weight=edge_weight
+            )
+
+    _worker_context["eg_graph"] = eg_graph
+    _worker_context["eg_indices"] = eg_indices
+    _worker_context["eg_distance_matrix"] = eg_distance_matrix
+    _worker_context["sgd_backend"] = sgd_backend
+    _worker_context["edges"] = edges
+    _worker_context["adjacency"] = adjacency
+    _worker_context["distance_matrix"] = cached_distance_matrix
+    _worker_context["stress_pivots"] = stress_pivots
+    _worker_context["crossing_relative_error"] = crossing_relative_error
+    _worker_context["metric_backend"] = metric_backend
+    _worker_context["pivot_cache"] = pivot_cache
+
+
+def ss_in_worker(params, seed):
+    with tracing.span("seed", seed=seed):
+        return ss(params=params, seed=seed, **_worker_context)
+
+
+def convergence_in_worker(params, seed, steps, schedule="prefix"):
+    with tracing.span("seed", seed=seed):
+        return convergence(
+            params=params,
+            seed=seed,
+            steps=steps,
+            schedule=schedule,
+            **_worker_context,
+        )
+
+
+def traced_ss_in_worker(params, seed):
+    return tracing.run_traced(ss_in_worker, params=params, seed=seed)
@@ -1,4 +1,5 @@
 # Third Party Library
+import numpy as np
 from egraph import Graph
 
 
@@ -12,3 +13,24 @@ def egraph_graph(nx_graph):
         eg_graph.add_edge(eg_indices[u], eg_indices[v], (u, v))
 
     return eg_graph, eg_indices
+
+
+def egraph_graph_from_bundle(bundle):
+    eg_graph = Graph()
+
+    node_ids = bundle["node_ids"].tolist()
+    eg_indices = {}
+    for u in node_ids:
+        eg_indices[u] = eg_graph.add_node(u)
+    for s, t in zip(bundle["sources"].tolist(), bundle["targets"].tolist()):
+        u, v = node_ids[s], node_ids[t]
+        eg_graph.add_edge(eg_indices[u], eg_indices[v], (u, v))
+
+    return eg_graph, eg_indices
+
+
+def egraph_edges(eg_graph):
+    return np.array(
+        [eg_graph.edge_endpoints(e) for e in eg_graph.edge_indices()],
+        dtype=np.int64,
+    ).reshape(-1, 2)
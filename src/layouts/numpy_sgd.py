@@ -0,0 +1,215 @@
+# Standard Library
+import hashlib
+
+# Third Party Library
+import numpy as np
+from scipy.sparse import coo_array
+from scipy.sparse.csgraph import shortest_path
+
+# pivots and their bfs rows per (graph, start node), see select_pivots,
+# together the cached rows of a process take at most PIVOT_CACHE_BYTES
+PIVOT_CACHE_BYTES = 256 * 2**20
+_pivot_cache = {}
+
+
+def adjacency_matrix(n, sources, targets):
+    rows = np.concatenate([sources, targets])
+    cols = np.concatenate([targets, sources])
+
+    return coo_array(
+        (np.ones(len(rows), dtype=np.float64), (rows, cols)), shape=(n, n)
+    ).tocsr()
+
+
+def bfs_distances(adjacency, indices):
+    return shortest_path(
+        adjacency, method="D", unweighted=True, indices=indices
+    )
+
+
+def evict(cache, max_bytes=None):
+    if max_bytes is None:
+        max_bytes = PIVOT_CACHE_BYTES
+
+    # least recently used entries are dropped first
+    nbytes = sum(entry["nbytes"] for entry in cache.values())
+    while cache and nbytes > max_bytes:
+        nbytes -= cache.pop(next(iter(cache)))["nbytes"]
+
+
+def _graph_key(n, sources, targets):
+    digest = hashlib.sha1(sources.tobytes())
+    digest.update(targets.tobytes())
+
+    return n, digest.hexdigest()
+
+
+def select_pivots(adjacency, number_of_pivots, rng, graph_key=None):
+    n = adjacency.shape[0]
+    h = min(number_of_pivots, n)
+
+    # max-min selection starting from a random node, which is nested: the
+    # first k pivots of h are the pivots of k, so the pivots of a graph and
+    # start node are extended and reused across numbers of pivots
+    start = rng.integers(n)
+    key = (graph_key, start)
+    if graph_key is not None and key in _pivot_cache:
+        entry = _pivot_cache.pop(key)
+    else:
+        distances = bfs_distances(adjacency, start)
+        entry = {
+            "pivots": [start],
+            "distances": [distances],
+            "min_distances": distances.copy(),
+        }
+    while len(entry["pivots"]) < h:
+        pivot = np.argmax(entry["min_distances"])
+        distances = bfs_distances(adjacency, pivot)
+        entry["pivots"].append(pivot)
+        entry["distances"].append(distances)
+        np.minimum(
+            entry["min_distances"], distances, out=entry["min_distances"]
+        )
+
+    if graph_key is not None:
+        # the bfs rows and the running minimum, float64 each
+        entry["nbytes"] = (len(entry["distances"]) + 1) * n * 8
+        _pivot_cache[key] = entry
+        evict(cache=_pivot_cache)
+
+    return (
+        np.array(entry["pivots"][:h], dtype=np.int64),
+        np.stack(entry["distances"][:h]).astype(np.float64),
+    )
+
+
+def node_pairs(n, sources, targets, pivots, pivot_distances, edge_length):
+    h = len(pivots)
+
+    # edges pull both endpoints with weight 1 / d^2
+    edge_d = np.full(len(sources), edge_length, dtype=np.float64)
+    edge_w = 1 / edge_d**2
+    i = [sources]
+    j = [targets]
+    d = [edge_d]
+    w_i = [edge_w]
+    w_j = [edge_w]
+
+    # a pivot stands in for the nodes of its region that are closer to it
+    # than half of its distance to the moved node
+    region = np.argmin(pivot_distances, axis=0)
+    edge_keys = np.concatenate(
+        [sources * n + targets, targets * n + sources]
+    ).astype(np.int64)
+    nodes = np.arange(n)
+    for k in range(h):
+        region_distances = np.sort(pivot_distances[k, region == k])
+        s = np.searchsorted(
+            region_distances, pivot_distances[k] / 2, side="right"
+        )
+        keys = nodes * n + pivots[k]
+        mask = (nodes != pivots[k]) & ~np.isin(keys, edge_keys)
+
+        pair_d = pivot_distances[k, mask] * edge_length
+        i.append(nodes[mask])
+        j.append(np.full(mask.sum(), pivots[k]))
+        d.append(pair_d)
+        w_i.append(s[mask] / pair_d**2)
+        w_j.append(np.zeros(mask.sum()))
+
+    return (
+        np.concatenate(i).astype(np.int64),
+        np.concatenate(j).astype(np.int64),
+        np.concatenate(d),
+        np.concatenate(w_i),
+        np.concatenate(w_j),
+    )
+
+
+def schedule(w, number_of_iterations, eps):
+    w = w[w > 0]
+    eta_max = 1 / w.min()
+    eta_min = eps / w.max()
+    if number_of_iterations == 1:
+        return np.array([eta_max])
+
+    b = np.log(eta_min / eta_max) / (number_of_iterations - 1)
+
+    return eta_max * np.exp(b * np.arange(number_of_iterations))
+
+
+def apply(pos, pairs, eta, rng, batch_size):
+    i, j, d, w_i, w_j = pairs
+    n = pos.shape[0]
+
+    order = rng.permutation(len(i))
+    for start in range(0, len(order), batch_size):
+        batch = order[start : start + batch_size]
+        bi = i[batch]
+        bj = j[batch]
+
+        delta = pos[bi] - pos[bj]
+        norm = np.linalg.norm(delta, axis=1)
+        norm[norm == 0] = np.finfo(pos.dtype).eps
+        r = (norm - d[batch]) / (2 * norm)
+        r_i = np.minimum(eta * w_i[batch], 1) * r
+        r_j = np.minimum(eta * w_j[batch], 1) * r
+
+        # a node touched by several pairs of the batch moves by the mean of
+        # its updates, which keeps large batches from overshooting
+        counts = np.bincount(bi, weights=r_i != 0, minlength=n)
+        counts += np.bincount(bj, weights=r_j != 0, minlength=n)
+        counts[counts == 0] = 1
+        for axis in range(2):
+            step = np.bincount(bj, weights=r_j * delta[:, axis], minlength=n)
+            step -= np.bincount(bi, weights=r_i * delta[:, axis], minlength=n)
+            pos[:, axis] += step / counts
+
+
+def sparse_sgd(
+    pos,
+    sources,
+    targets,
+    params,
+    seed,
+    batch_size=None,
+    schedule_iterations=None,
+    on_step=None,
+    adjacency=None,
+):
+    pos = np.array(pos, dtype=np.float64)
+    n = pos.shape[0]
+    sources = np.asarray(sources, dtype=np.int64)
+    targets = np.asarray(targets, dtype=np.int64)
+    if batch_size is None:
+        batch_size = n
+
+    rng = np.random.default_rng(seed)
+    if adjacency is None:
+        adjacency = adjacency_matrix(n=n, sources=sources, targets=targets)
+    pivots, pivot_distances = select_pivots(
+        adjacency=adjacency,
+        number_of_pivots=params["number_of_pivots"],
+        rng=rng,
+        graph_key=_graph_key(n=n, sources=sources, targets=targets),
+    )
+    pairs = node_pairs(
+        n=n,
+        sources=sources,
+        targets=targets,
+        pivots=pivots,
+        pivot_distances=pivot_distances,
+        edge_length=params["edge_length"],
+    )
+
+    if schedule_iterations is None:
+        schedule_iterations = params["number_of_iterations"]
+    etas = schedule(
+        w=pairs[3], number_of_iterations=schedule_iterations, eps=params["eps"]
+    )
+    for step, eta in enumerate(etas[: params["number_of_iterations"]], 1):
+        apply(pos=pos, pairs=pairs, eta=eta, rng=rng, batch_size=batch_size)
+        if on_step is not None:
+            on_step(step, pos.copy)
+
+    return pos
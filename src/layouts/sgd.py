@@ -1,28 +1,291 @@
-# Third Party Library
-from egraph import Rng, SparseSgd
+# Standard Library
+import math
 
+# First Party Library
+from config import const, parameters
+from layouts import numpy_sgd
+from utils import drawing, tracing
 
-def sgd(eg_graph, eg_indices, eg_drawing, params, seed):
-    rng = Rng.seed_from(seed)
-    sparse_sgd = SparseSgd(
-        eg_graph,
-        lambda _: params["edge_length"],
-        params["number_of_pivots"],
-        rng,
-    )
+BACKENDS = ["egraph", "numpy"]
+
+# "exponential" decays eta from eta_max to eps / w_max within the iteration
+# budget, "prefix" decays it over the largest budget of the domain, so a run
+# with a smaller budget is a prefix of a longer one with the same seed
+SCHEDULES = ["exponential", "prefix"]
+PREFIX_ITERATIONS = parameters.domain_ss["number_of_iterations"]["u"]
+
+# pivots and distance matrices egraph chose per (graph, edge length, seed),
+# see _egraph_pivots, bounded like the cache of numpy_sgd
+_pivot_cache = {}
+# egraph cannot advance a generator past the pivot choice without redoing
+# it, so runs on cached pivots shuffle with a generator of their own whose
+# seed is out of the range of the run seeds
+SHUFFLE_SEED_OFFSET = const.RAND_MAX + 1
+
+
+def schedule_iterations(params, schedule):
+    if schedule not in SCHEDULES:
+        raise ValueError(f"unknown sgd schedule: {schedule}")
+    if schedule == "exponential":
+        return params["number_of_iterations"]
+
+    return max(params["number_of_iterations"], PREFIX_ITERATIONS)
+
+
+def snapshot_steps(number_of_iterations, every=None, growth=None):
+    # every k steps or on a geometric schedule, the last step is always kept
+    steps = {number_of_iterations}
+    if every is not None:
+        steps.update(range(every, number_of_iterations, every))
+    if growth is not None:
+        if growth <= 1:
+            raise ValueError(f"growth must be greater than 1, got {growth}")
+        step = 1.0
+        while step < number_of_iterations:
+            steps.add(math.ceil(step))
+            step *= growth
+
+    return sorted(steps)
+
+
+def _egraph_pivots(eg_graph, edge_length, number_of_pivots, seed):
+    # Third Party Library
+    from egraph import Rng, SparseSgd
+
+    # the pivot choice is nested: the first k pivots of h are the pivots of
+    # k, so the largest choice of a graph and seed answers every smaller one
+    key = (id(eg_graph), edge_length, seed)
+    entry = _pivot_cache.pop(key, None)
+    if entry is None or len(entry["pivots"]) < number_of_pivots:
+        pivots, distance_matrix = SparseSgd.choose_pivot(
+            eg_graph,
+            lambda _: edge_length,
+            number_of_pivots,
+            Rng.seed_from(seed),
+        )
+        entry = {
+            # keeps the id of eg_graph from being reused while cached
+            "eg_graph": eg_graph,
+            "pivots": pivots,
+            "distance_matrix": distance_matrix,
+            # one float32 row per pivot
+            "nbytes": len(pivots) * eg_graph.node_count() * 4,
+        }
+    _pivot_cache[key] = entry
+    numpy_sgd.evict(cache=_pivot_cache)
+
+    return entry["pivots"][:number_of_pivots], entry["distance_matrix"]
+
+
+def _sgd_egraph(
+    eg_graph,
+    eg_drawing,
+    params,
+    seed,
+    schedule="exponential",
+    on_step=None,
+    pivot_cache=False,
+):
+    # imported here so that the numpy backend works without the extension
+    # Third Party Library
+    from egraph import Rng, SparseSgd
+
+    if pivot_cache:
+        # the same pivots as below, shuffled in a different order
+        pivots, distance_matrix = _egraph_pivots(
+            eg_graph=eg_graph,
+            edge_length=params["edge_length"],
+            number_of_pivots=params["number_of_pivots"],
+            seed=seed,
+        )
+        rng = Rng.seed_from(seed + SHUFFLE_SEED_OFFSET)
+        sparse_sgd = SparseSgd.new_with_pivot_and_distance_matrix(
+            eg_graph,
+            lambda _: params["edge_length"],
+            pivots,
+            distance_matrix,
+        )
+    else:
+        rng = Rng.seed_from(seed)
+        sparse_sgd = SparseSgd(
+            eg_graph,
+            lambda _: params["edge_length"],
+            params["number_of_pivots"],
+            rng,
+        )
     scheduler = sparse_sgd.scheduler(
-        params["number_of_iterations"],
+        schedule_iterations(params=params, schedule=schedule),
         params["eps"],
     )
 
-    def step(eta):
+    # the etas are collected first so that a prefix schedule can stop early
+    etas = []
+    scheduler.run(etas.append)
+    n = eg_graph.node_count()
+    for step, eta in enumerate(etas[: params["number_of_iterations"]], 1):
         sparse_sgd.shuffle(rng)
         sparse_sgd.apply(eg_drawing, eta)
+        if on_step is not None:
+            on_step(
+                step, lambda: drawing.from_egraph(eg_drawing=eg_drawing, n=n)
+            )
+
+
+def _sgd_numpy(
+    eg_graph,
+    eg_drawing,
+    params,
+    seed,
+    schedule="exponential",
+    on_step=None,
+    edges=None,
+    adjacency=None,
+):
+    n = eg_graph.node_count()
+    if edges is None:
+        # First Party Library
+        from generators import graph as graph_generator
+
+        edges = graph_generator.egraph_edges(eg_graph=eg_graph)
+
+    pos = numpy_sgd.sparse_sgd(
+        pos=drawing.from_egraph(eg_drawing=eg_drawing, n=n),
+        sources=edges[:, 0],
+        targets=edges[:, 1],
+        params=params,
+        seed=seed,
+        schedule_iterations=schedule_iterations(
+            params=params, schedule=schedule
+        ),
+        on_step=on_step,
+        adjacency=adjacency,
+    )
+    drawing.to_egraph(pos=pos, eg_drawing=eg_drawing)
+
+    return pos
+
+
+def sgd(
+    eg_graph,
+    eg_indices,
+    eg_drawing,
+    params,
+    seed,
+    backend="egraph",
+    schedule="exponential",
+    edges=None,
+    adjacency=None,
+    pivot_cache=False,
+):
+    # edges and adjacency of the graph, if given, spare the numpy backend
+    # rebuilding them from eg_graph, pivot_cache reuses the pivots of the
+    # egraph backend across runs with the same seed
+    if backend not in BACKENDS:
+        raise ValueError(f"unknown sgd backend: {backend}")
+
+    with tracing.span(
+        "sgd",
+        backend=backend,
+        number_of_iterations=params["number_of_iterations"],
+    ):
+        pos = _sgd(
+            eg_graph=eg_graph,
+            eg_indices=eg_indices,
+            eg_drawing=eg_drawing,
+            params=params,
+            seed=seed,
+            backend=backend,
+            schedule=schedule,
+            edges=edges,
+            adjacency=adjacency,
+            pivot_cache=pivot_cache,
+        )
+
+    return pos
+
+
+def sgd_trace(
+    eg_graph,
+    eg_indices,
+    eg_drawing,
+    params,
+    seed,
+    steps,
+    backend="egraph",
+    schedule="prefix",
+    edges=None,
+    adjacency=None,
+    pivot_cache=False,
+):
+    # one run that keeps the drawing after each of the given steps, with
+    # the prefix schedule the drawing after step k is the drawing a run
+    # with number_of_iterations = k ends with
+    if backend not in BACKENDS:
+        raise ValueError(f"unknown sgd backend: {backend}")
+
+    steps = set(steps)
+    snapshots = []
+
+    def on_step(step, get_pos):
+        if step in steps:
+            snapshots.append((step, get_pos()))
+
+    with tracing.span(
+        "sgd_trace",
+        backend=backend,
+        number_of_iterations=params["number_of_iterations"],
+    ):
+        _sgd(
+            eg_graph=eg_graph,
+            eg_indices=eg_indices,
+            eg_drawing=eg_drawing,
+            params=params,
+            seed=seed,
+            backend=backend,
+            schedule=schedule,
+            on_step=on_step,
+            edges=edges,
+            adjacency=adjacency,
+            pivot_cache=pivot_cache,
+        )
+
+    return snapshots
 
-    scheduler.run(step)
 
-    pos = {
-        u: (eg_drawing.x(i), eg_drawing.y(i)) for u, i in eg_indices.items()
-    }
+def _sgd(
+    eg_graph,
+    eg_indices,
+    eg_drawing,
+    params,
+    seed,
+    backend,
+    schedule="exponential",
+    on_step=None,
+    edges=None,
+    adjacency=None,
+    pivot_cache=False,
+):
+    if backend == "egraph":
+        _sgd_egraph(
+            eg_graph=eg_graph,
+            eg_drawing=eg_drawing,
+            params=params,
+            seed=seed,
+            schedule=schedule,
+            on_step=on_step,
+            pivot_cache=pivot_cache,
+        )
+        pos = drawing.from_egraph(eg_drawing=eg_drawing, n=len(eg_indices))
+    elif backend == "numpy":
+        pos = _sgd_numpy(
+            eg_graph=eg_graph,
+            eg_drawing=eg_drawing,
+            params=params,
+            seed=seed,
+            schedule=schedule,
+            on_step=on_step,
+            edges=edges,
+            adjacency=adjacency,
+        )
 
     return pos
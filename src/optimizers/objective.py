@@ -1,81 +1,362 @@
+# Standard Library
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+
 # Third Party Library
 import optuna
-from egraph import Coordinates, warshall_floyd
 
 # First Party Library
 from config import parameters, quality_metrics
-from generators import graph as graph_generator
-from layouts import sgd
-from utils.quality_metrics import measure_qualities
+from generators import drawing_and_qualities
+from optimizers import pruners
+from utils import evaluation_store, shared_arrays, tracing
+from utils.quality_metrics import (
+    confidence_interval,
+    max_error_bounds,
+    mean_timings,
+)
 
 
-def ss(
-    nx_graph,
-    target_qm_names,
+@contextmanager
+def workers(
+    bundle,
     edge_weight,
+    n_jobs,
     n_seed,
-    result_handler,
-    generate_seed,
+    sgd_backend="egraph",
+    stress_pivots=None,
+    crossing_relative_error=None,
+    metric_backend="egraph",
 ):
-    eg_graph, eg_indices = graph_generator.egraph_graph(nx_graph=nx_graph)
-    eg_distance_matrix = warshall_floyd(eg_graph, lambda _: edge_weight)
-
-    def objective(trial: optuna.Trial):
-        params = {
-            "edge_length": edge_weight,
-            "number_of_pivots": trial.suggest_int(
-                "number_of_pivots",
-                parameters.domain_ss["number_of_pivots"]["l"],
-                parameters.domain_ss["number_of_pivots"]["u"],
-            ),
-            "number_of_iterations": trial.suggest_int(
-                "number_of_iterations",
-                parameters.domain_ss["number_of_iterations"]["l"],
-                parameters.domain_ss["number_of_iterations"]["u"],
-            ),
-            "eps": trial.suggest_float(
-                "eps",
-                parameters.domain_ss["eps"]["l"],
-                parameters.domain_ss["eps"]["u"],
+    # workers build the graph and distance matrix once and live across trials
+    if n_jobs <= 1:
+        drawing_and_qualities.init_worker(
+            bundle=bundle,
+            edge_weight=edge_weight,
+            sgd_backend=sgd_backend,
+            stress_pivots=stress_pivots,
+            crossing_relative_error=crossing_relative_error,
+            metric_backend=metric_backend,
+        )
+        yield None
+        return
+
+    # workers attach to one shared copy of the graph arrays
+    handle, blocks = drawing_and_qualities.share_bundle(
+        bundle=bundle,
+        edge_weight=edge_weight,
+        stress_pivots=stress_pivots,
+        metric_backend=metric_backend,
+    )
+    try:
+        with ProcessPoolExecutor(
+            max_workers=min(n_jobs, n_seed),
+            initializer=drawing_and_qualities.init_worker,
+            initargs=(
+                handle,
+                edge_weight,
+                sgd_backend,
+                stress_pivots,
+                crossing_relative_error,
+                metric_backend,
+                True,
             ),
-        }
+        ) as executor:
+            yield executor
+    finally:
+        shared_arrays.release(blocks=blocks, unlink=True)
 
-        trial.set_user_attr("params", params)
 
-        qualities_list = {}
-        for qm_name in quality_metrics.qm_names:
-            qualities_list[qm_name] = []
+def suggest_params(trial, edge_weight):
+    return {
+        "edge_length": edge_weight,
+        "number_of_pivots": trial.suggest_int(
+            "number_of_pivots",
+            parameters.domain_ss["number_of_pivots"]["l"],
+            parameters.domain_ss["number_of_pivots"]["u"],
+        ),
+        "number_of_iterations": trial.suggest_int(
+            "number_of_iterations",
+            parameters.domain_ss["number_of_iterations"]["l"],
+            parameters.domain_ss["number_of_iterations"]["u"],
+        ),
+        "eps": trial.suggest_float(
+            "eps",
+            parameters.domain_ss["eps"]["l"],
+            parameters.domain_ss["eps"]["u"],
+        ),
+    }
+
+
+def prune(context, trial, qualities_result, step, n_seeds, futures=()):
+    # judge the trial on what has been evaluated so far
+    if pruners.should_prune(
+        trial=trial,
+        values=[
+            qualities_result[qm_name] for qm_name in context["target_qm_names"]
+        ],
+        step=step,
+        dominance_pruning=context["dominance_pruning"],
+        n_seeds=n_seeds,
+    ):
+        for future in futures:
+            future.cancel()
+        trial.set_user_attr("qualities", qualities_result)
+        raise optuna.TrialPruned()
+
+
+def collect(traced_result):
+    result, worker_events = traced_result
+    tracing.add_events(worker_events)
 
-        for _ in range(n_seed):
-            seed = generate_seed()
-            eg_drawing = Coordinates.initial_placement(eg_graph)
+    return result
 
-            _ = sgd.sgd(
-                eg_graph=eg_graph,
-                eg_indices=eg_indices,
-                eg_drawing=eg_drawing,
+
+def run_seeds(executor, params, seeds):
+    futures = []
+    if executor is None:
+        results = (
+            drawing_and_qualities.ss_in_worker(params=params, seed=seed)
+            for seed in seeds
+        )
+    elif tracing.is_enabled():
+        futures = [
+            executor.submit(
+                drawing_and_qualities.traced_ss_in_worker, params, seed
+            )
+            for seed in seeds
+        ]
+        results = (collect(future.result()) for future in futures)
+    else:
+        futures = [
+            executor.submit(drawing_and_qualities.ss_in_worker, params, seed)
+            for seed in seeds
+        ]
+        results = (future.result() for future in futures)
+
+    return results, futures
+
+
+def cached_result(store, params, seed, qualities):
+    # a cached seed took no time but keeps its error bounds
+    return (
+        None,
+        qualities,
+        {
+            "intermediates": {},
+            "qualities": {},
+            "confidence_intervals": {},
+            "error_bounds": evaluation_store.lookup_error_bounds(
+                store=store, params=params, seed=seed
+            ),
+        },
+    )
+
+
+def cached_results(store, params, seeds, cached, results):
+    # the evaluations of a trial are written to the store together, also
+    # when it is pruned
+    try:
+        for seed, qualities in zip(seeds, cached):
+            if qualities is not None:
+                yield cached_result(
+                    store=store, params=params, seed=seed, qualities=qualities
+                )
+                continue
+
+            _, qualities, timings = next(results)
+            evaluation_store.add(
+                store=store,
                 params=params,
                 seed=seed,
+                qualities=qualities,
+                error_bounds=timings["error_bounds"],
+            )
+            yield None, qualities, timings
+    finally:
+        evaluation_store.flush(store)
+
+
+def results_with_store(executor, store, params, seeds):
+    # only the seeds the store does not know yet are run
+    if store is None:
+        return run_seeds(executor=executor, params=params, seeds=seeds)
+
+    evaluation_store.refresh(store)
+    cached = [
+        evaluation_store.lookup(store=store, params=params, seed=seed)
+        for seed in seeds
+    ]
+    results, futures = run_seeds(
+        executor=executor,
+        params=params,
+        seeds=[
+            seed for seed, qualities in zip(seeds, cached) if qualities is None
+        ],
+    )
+
+    return (
+        cached_results(
+            store=store,
+            params=params,
+            seeds=seeds,
+            cached=cached,
+            results=results,
+        ),
+        futures,
+    )
+
+
+def record(trial, timings_list, qualities_result):
+    # seconds per intermediate and metric, cached seeds left out, and the
+    # 95% error bounds and intervals of approximated metrics
+    error_bounds = max_error_bounds(timings_list)
+    trial.set_user_attr("timings", mean_timings(timings_list))
+    trial.set_user_attr("error_bounds", error_bounds)
+    trial.set_user_attr(
+        "confidence_intervals",
+        {
+            qm_name: confidence_interval(
+                quality=qualities_result[qm_name], error_bound=error_bound
             )
+            for qm_name, error_bound in error_bounds.items()
+        },
+    )
+
+
+def evaluate(context, trial, params, seeds, prune_between_seeds):
+    qualities_list = {}
+    for qm_name in quality_metrics.qm_names:
+        qualities_list[qm_name] = []
 
-            qualities = measure_qualities(
-                target_qm_names=quality_metrics.qm_names,
-                eg_graph=eg_graph,
-                eg_drawing=eg_drawing,
-                eg_distance_matrix=eg_distance_matrix,
+    results, futures = results_with_store(
+        executor=context["executor"],
+        store=context["store"],
+        params=params,
+        seeds=seeds,
+    )
+
+    timings_list = []
+    for step, (_, qualities, timings) in enumerate(results, start=1):
+        for qm_name in quality_metrics.qm_names:
+            qualities_list[qm_name].append(qualities[qm_name])
+        timings_list.append(timings)
+        if prune_between_seeds and step < len(seeds):
+            qualities_result = context["result_handler"](qualities_list)
+            record(
+                trial=trial,
+                timings_list=timings_list,
+                qualities_result=qualities_result,
+            )
+            prune(
+                context=context,
+                trial=trial,
+                qualities_result=qualities_result,
+                step=step,
+                n_seeds=step,
+                futures=futures,
             )
 
-            for qm_name in quality_metrics.qm_names:
-                qualities_list[qm_name].append(qualities[qm_name])
+    qualities_result = context["result_handler"](qualities_list)
+    record(
+        trial=trial,
+        timings_list=timings_list,
+        qualities_result=qualities_result,
+    )
 
-        qualities_result = result_handler(qualities_list)
+    return qualities_result
 
-        trial.set_user_attr("qualities", qualities_result)
 
-        result = tuple(
-            [qualities_result[qm_name] for qm_name in target_qm_names]
+def run(context, trial, params, seeds):
+    # cheap runs with a fraction of the iterations come first and only
+    # promising trials go on to the full budget
+    for budget in context["iteration_budgets"]:
+        budget_params = {
+            **params,
+            "number_of_iterations": max(
+                1, params["number_of_iterations"] * budget // 100
+            ),
+        }
+        with tracing.span("evaluate", budget=budget):
+            qualities_result = evaluate(
+                context=context,
+                trial=trial,
+                params=budget_params,
+                seeds=seeds,
+                prune_between_seeds=False,
+            )
+        prune(
+            context=context,
+            trial=trial,
+            qualities_result=qualities_result,
+            step=budget,
+            n_seeds=len(seeds),
+        )
+
+    with tracing.span("evaluate", budget=100):
+        qualities_result = evaluate(
+            context=context,
+            trial=trial,
+            params=params,
+            seeds=seeds,
+            prune_between_seeds=len(context["iteration_budgets"]) == 0,
         )
 
-        return result
+    trial.set_user_attr("qualities", qualities_result)
+
+    result = tuple(
+        [qualities_result[qm_name] for qm_name in context["target_qm_names"]]
+    )
+
+    return result
+
+
+def objective(context, trial: optuna.Trial):
+    params = suggest_params(trial=trial, edge_weight=context["edge_weight"])
+
+    trial.set_user_attr("params", params)
+
+    seeds = [context["generate_seed"]() for _ in range(context["n_seed"])]
+
+    since = tracing.mark()
+    try:
+        with tracing.span("trial", number=trial.number):
+            return run(
+                context=context, trial=trial, params=params, seeds=seeds
+            )
+    finally:
+        if tracing.is_enabled():
+            trial.set_user_attr("trace", tracing.summary(since=since))
+
+
+def ss(
+    target_qm_names,
+    edge_weight,
+    n_seed,
+    result_handler,
+    generate_seed,
+    executor=None,
+    dominance_pruning=False,
+    iteration_budgets=(),
+    evaluation_store_path=None,
+):
+    # evaluations shared with every study and script using the same store
+    store = None
+    if evaluation_store_path is not None:
+        store = evaluation_store.open_store(evaluation_store_path)
+
+    # what the steps of a trial need, see objective
+    context = {
+        "target_qm_names": target_qm_names,
+        "edge_weight": edge_weight,
+        "n_seed": n_seed,
+        "result_handler": result_handler,
+        "generate_seed": generate_seed,
+        "executor": executor,
+        "store": store,
+        "dominance_pruning": dominance_pruning,
+        "iteration_budgets": iteration_budgets,
+    }
 
-    return objective
+    return partial(objective, context)
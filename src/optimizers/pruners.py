@@ -0,0 +1,104 @@
+# Third Party Library
+import optuna
+
+PRUNER_NAMES = [
+    "none",
+    "median",
+    "successive_halving",
+    "hyperband",
+    "dominance",
+]
+
+# a trial is compared with the completed trials at the same step once its
+# values rest on DOMINANCE_MIN_SEEDS seeds, and is only pruned if one of
+# them is better by DOMINANCE_MARGIN of its value in every objective
+DOMINANCE_MIN_SEEDS = 3
+DOMINANCE_MARGIN = 0.05
+
+
+def create_pruner(pruner_name, min_resource, max_resource):
+    # dominance pruning is decided inside the objective because optuna
+    # pruners only support single-objective studies
+    if pruner_name in ["none", "dominance"]:
+        return optuna.pruners.NopPruner()
+    elif pruner_name == "median":
+        return optuna.pruners.MedianPruner(n_startup_trials=5)
+    elif pruner_name == "successive_halving":
+        return optuna.pruners.SuccessiveHalvingPruner(
+            min_resource=min_resource
+        )
+    elif pruner_name == "hyperband":
+        return optuna.pruners.HyperbandPruner(
+            min_resource=min_resource, max_resource=max_resource
+        )
+
+    raise ValueError(f"unknown pruner: {pruner_name}")
+
+
+def dominates(values, other_values, directions, margin=0.0):
+    better = False
+    for value, other_value, direction in zip(values, other_values, directions):
+        if direction == optuna.study.StudyDirection.MINIMIZE:
+            value, other_value = -value, -other_value
+        if value < other_value:
+            return False
+        if margin > 0 and value - other_value <= margin * abs(other_value):
+            return False
+        if value > other_value:
+            better = True
+
+    return better
+
+
+def is_dominated(
+    study, values, step, n_startup_trials=5, margin=DOMINANCE_MARGIN
+):
+    # final values of a completed trial rest on more seeds or iterations
+    # than the partial values at step, so its values at step are used
+    completed_values = [
+        completed_trial.user_attrs["intermediate_values"][str(step)]
+        for completed_trial in study.get_trials(
+            deepcopy=False, states=(optuna.trial.TrialState.COMPLETE,)
+        )
+        if str(step)
+        in completed_trial.user_attrs.get("intermediate_values", {})
+    ]
+    if len(completed_values) < n_startup_trials:
+        return False
+
+    return any(
+        [
+            dominates(
+                values=other_values,
+                other_values=values,
+                directions=study.directions,
+                margin=margin,
+            )
+            for other_values in completed_values
+        ]
+    )
+
+
+def should_prune(trial, values, step, dominance_pruning, n_seeds):
+    # kept for the trials that are compared with this one at the same step
+    trial.set_user_attr(
+        "intermediate_values",
+        {
+            **trial.user_attrs.get("intermediate_values", {}),
+            str(step): list(values),
+        },
+    )
+
+    if len(values) == 1:
+        trial.report(values[0], step=step)
+        if trial.should_prune():
+            return True
+
+    if (
+        dominance_pruning
+        and n_seeds >= DOMINANCE_MIN_SEEDS
+        and is_dominated(study=trial.study, values=values, step=step)
+    ):
+        return True
+
+    return False
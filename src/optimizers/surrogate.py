@@ -0,0 +1,72 @@
+# Standard Library
+import pickle
+
+# Third Party Library
+import numpy as np
+import pandas as pd
+from lightgbm import LGBMRegressor
+from sklearn.ensemble import HistGradientBoostingRegressor
+
+# First Party Library
+from utils import segment_store
+
+P_NAMES = ["number_of_pivots", "number_of_iterations", "eps"]
+MODEL_NAMES = ["lightgbm", "hist_gradient_boosting"]
+
+
+def load_grid_df(data_dir):
+    grid_dir = data_dir.joinpath("grid")
+    grid_data_path = grid_dir.joinpath("20split")
+    if grid_data_path.exists():
+        return segment_store.read_df(grid_data_path)
+
+    return pd.concat(
+        [
+            pd.read_pickle(grid_dir.joinpath(f"20split-{i}.pkl"))
+            for i in range(4)
+        ]
+    )
+
+
+def params_array(params_list):
+    return np.array(
+        [[params[p_name] for p_name in P_NAMES] for params in params_list],
+        dtype=np.float64,
+    ).reshape(-1, len(P_NAMES))
+
+
+def create_model(model_name):
+    if model_name == "lightgbm":
+        return LGBMRegressor(n_estimators=500, learning_rate=0.05)
+    elif model_name == "hist_gradient_boosting":
+        return HistGradientBoostingRegressor(max_iter=500)
+
+    raise ValueError(f"unknown surrogate model: {model_name}")
+
+
+def train(df, qm_names, model_name):
+    x = params_array(df["params"])
+
+    models = {}
+    for qm_name in qm_names:
+        y = np.array([qualities[qm_name] for qualities in df["qualities"]])
+        models[qm_name] = create_model(model_name=model_name).fit(x, y)
+
+    return models
+
+
+def predict(models, params):
+    # params is an (n, 3) array with columns in the order of P_NAMES
+    x = np.asarray(params, dtype=np.float64).reshape(-1, len(P_NAMES))
+
+    return {qm_name: model.predict(x) for qm_name, model in models.items()}
+
+
+def save(models, path):
+    with path.open(mode="wb") as f:
+        pickle.dump(models, f)
+
+
+def load(path):
+    with path.open(mode="rb") as f:
+        return pickle.load(f)
@@ -1,8 +1,30 @@
 # Third Party Library
 from egraph import angular_resolution
 
+# First Party Library
+from generators import graph as graph_generator
+from layouts import numpy_sgd
+from utils import angular_metrics, drawing
+
 direction = "maximize"
+requires = ["eg_graph", "eg_drawing"]
+numpy_requires = ["pos", "adjacency"]
 
 
-def quality(eg_graph, eg_drawing):
+def quality(eg_graph, eg_drawing, backend="egraph"):
+    if backend == "numpy":
+        n = eg_graph.node_count()
+        edges = graph_generator.egraph_edges(eg_graph=eg_graph)
+        return numpy_quality(
+            pos=drawing.from_egraph(eg_drawing=eg_drawing, n=n),
+            adjacency=numpy_sgd.adjacency_matrix(
+                n=n, sources=edges[:, 0], targets=edges[:, 1]
+            ),
+        )
     return -angular_resolution(eg_graph, eg_drawing)
+
+
+def numpy_quality(pos, adjacency):
+    return -angular_metrics.angular_resolution(
+        pos=pos, indptr=adjacency.indptr, indices=adjacency.indices
+    )
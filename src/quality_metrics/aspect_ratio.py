@@ -2,6 +2,7 @@
 from egraph import aspect_ratio
 
 direction = "maximize"
+requires = ["eg_drawing"]
 
 
 def quality(eg_drawing):
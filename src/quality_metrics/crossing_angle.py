@@ -1,10 +1,43 @@
 # Third Party Library
+import numpy as np
 from egraph import crossing_angle, crossing_edges
 
+# First Party Library
+from generators import graph as graph_generator
+from utils import angular_metrics, crossing_estimator, drawing
+
 direction = "maximize"
+requires = ["eg_graph", "eg_drawing", "eg_crossings"]
+approximate_requires = ["pos", "edges"]
+numpy_requires = ["pos", "edges", "crossing_pairs"]
 
 
-def quality(eg_graph, eg_drawing, eg_crossings=None):
+def quality(eg_graph, eg_drawing, eg_crossings=None, backend="egraph"):
+    if backend == "numpy":
+        return numpy_quality(
+            pos=drawing.from_egraph(
+                eg_drawing=eg_drawing, n=eg_graph.node_count()
+            ),
+            edges=graph_generator.egraph_edges(eg_graph=eg_graph),
+        )
     if eg_crossings is None:
         eg_crossings = crossing_edges(eg_graph, eg_drawing)
     return -crossing_angle(eg_graph, eg_drawing, eg_crossings)
+
+
+def numpy_quality(pos, edges, crossing_pairs=None):
+    return -angular_metrics.crossing_angle(
+        pos=pos, edges=edges, pairs=crossing_pairs
+    )
+
+
+def approximate_quality(pos, edges, relative_error=0.05, seed=0):
+    value, error_bound = crossing_estimator.estimate(
+        pos=pos,
+        edges=edges,
+        weight="angle",
+        relative_error=relative_error,
+        rng=np.random.default_rng(seed),
+    )
+
+    return -value, error_bound
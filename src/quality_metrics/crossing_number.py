@@ -1,10 +1,45 @@
 # Third Party Library
+import numpy as np
 from egraph import crossing_edges, crossing_number
 
+# First Party Library
+from generators import graph as graph_generator
+from utils import crossing_estimator, drawing
+from utils.edge_crossing_finder import crossing_pairs
+
 direction = "maximize"
+requires = ["eg_graph", "eg_drawing", "eg_crossings"]
+approximate_requires = ["pos", "edges"]
+numpy_requires = ["crossing_pairs"]
 
 
-def quality(eg_graph, eg_drawing, eg_crossings=None):
+def quality(eg_graph, eg_drawing, eg_crossings=None, backend="egraph"):
+    if backend == "numpy":
+        pos = drawing.from_egraph(
+            eg_drawing=eg_drawing, n=eg_graph.node_count()
+        )
+        edges = graph_generator.egraph_edges(eg_graph=eg_graph)
+        return numpy_quality(
+            crossing_pairs=crossing_pairs(
+                p1=pos[edges[:, 0]], p2=pos[edges[:, 1]]
+            )
+        )
     if eg_crossings is None:
         eg_crossings = crossing_edges(eg_graph, eg_drawing)
     return -crossing_number(eg_graph, eg_drawing, eg_crossings)
+
+
+def numpy_quality(crossing_pairs):
+    return -float(len(crossing_pairs[0]))
+
+
+def approximate_quality(pos, edges, relative_error=0.05, seed=0):
+    value, error_bound = crossing_estimator.estimate(
+        pos=pos,
+        edges=edges,
+        weight="number",
+        relative_error=relative_error,
+        rng=np.random.default_rng(seed),
+    )
+
+    return -value, error_bound
@@ -1,13 +1,39 @@
 # Third Party Library
+import numpy as np
 from egraph import all_sources_bfs, ideal_edge_lengths
 
 # First Party Library
 from config import const
+from generators import graph as graph_generator
+from utils import drawing
 
 direction = "maximize"
+requires = ["eg_graph", "eg_drawing", "eg_distance_matrix"]
+approximate_requires = ["pos", "edges"]
+numpy_requires = ["pos", "edges"]
 
 
-def quality(eg_graph, eg_drawing, eg_distance_matrix=None):
+def quality(eg_graph, eg_drawing, eg_distance_matrix=None, backend="egraph"):
+    if backend == "numpy":
+        return numpy_quality(
+            pos=drawing.from_egraph(
+                eg_drawing=eg_drawing, n=eg_graph.node_count()
+            ),
+            edges=graph_generator.egraph_edges(eg_graph=eg_graph),
+        )
     if eg_distance_matrix is None:
         eg_distance_matrix = all_sources_bfs(eg_graph, const.EDGE_WEIGHT)
     return -ideal_edge_lengths(eg_graph, eg_drawing, eg_distance_matrix)
+
+
+def numpy_quality(pos, edges):
+    # adjacent nodes are exactly one edge weight apart, so the value needs
+    # no distance matrix
+    norms = np.linalg.norm(pos[edges[:, 0]] - pos[edges[:, 1]], axis=1)
+
+    return -np.sum(((norms - const.EDGE_WEIGHT) / const.EDGE_WEIGHT) ** 2)
+
+
+def approximate_quality(pos, edges):
+    # the edge-only value is exact, so it carries no error
+    return numpy_quality(pos=pos, edges=edges), 0.0
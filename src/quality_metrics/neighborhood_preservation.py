@@ -1,8 +1,27 @@
 # Third Party Library
 from egraph import neighborhood_preservation
 
+# First Party Library
+from generators import graph as graph_generator
+from utils import drawing, spatial_metrics
+
 direction = "maximize"
+requires = ["eg_graph", "eg_drawing"]
+numpy_requires = ["pos", "edges", "kd_tree"]
 
 
-def quality(eg_graph, eg_drawing):
+def quality(eg_graph, eg_drawing, backend="egraph"):
+    if backend == "numpy":
+        return numpy_quality(
+            pos=drawing.from_egraph(
+                eg_drawing=eg_drawing, n=eg_graph.node_count()
+            ),
+            edges=graph_generator.egraph_edges(eg_graph=eg_graph),
+        )
     return neighborhood_preservation(eg_graph, eg_drawing)
+
+
+def numpy_quality(pos, edges, kd_tree=None):
+    return spatial_metrics.neighborhood_preservation(
+        pos=pos, edges=edges, tree=kd_tree
+    )
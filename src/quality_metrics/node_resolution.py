@@ -1,8 +1,23 @@
 # Third Party Library
 from egraph import node_resolution
 
+# First Party Library
+from utils import drawing, spatial_metrics
+
 direction = "maximize"
+requires = ["eg_graph", "eg_drawing"]
+numpy_requires = ["pos", "kd_tree"]
 
 
-def quality(eg_graph, eg_drawing):
+def quality(eg_graph, eg_drawing, backend="egraph"):
+    if backend == "numpy":
+        return numpy_quality(
+            pos=drawing.from_egraph(
+                eg_drawing=eg_drawing, n=eg_graph.node_count()
+            )
+        )
     return -node_resolution(eg_graph, eg_drawing)
+
+
+def numpy_quality(pos, kd_tree=None):
+    return -spatial_metrics.node_resolution(pos=pos, tree=kd_tree)
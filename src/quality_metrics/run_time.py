@@ -1,18 +1,12 @@
-# Standard Library
-import time
+# First Party Library
+from utils import tracing
 
 direction = "minimize"
 
 
-class RunTime:
-    _start_time = None
-    _end_time = None
-
-    def start(self):
-        self._start_time = time.perf_counter()
-
-    def end(self):
-        self._end_time = time.perf_counter()
+class RunTime(tracing.Span):
+    def __init__(self):
+        super().__init__(name="run_time", args={})
 
     def quality(self):
-        return self._end_time - self._start_time
+        return self.duration()
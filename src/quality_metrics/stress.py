@@ -1,13 +1,48 @@
 # Third Party Library
+import numpy as np
 from egraph import all_sources_bfs, stress
+from scipy.sparse.csgraph import shortest_path
 
 # First Party Library
 from config import const
+from generators import graph as graph_generator
+from layouts import numpy_sgd
+from utils import drawing, sparse_stress
 
 direction = "maximize"
+requires = ["eg_graph", "eg_drawing", "eg_distance_matrix"]
+approximate_requires = ["pos", "adjacency"]
+numpy_requires = ["pos", "distance_matrix"]
 
 
-def quality(eg_graph, eg_drawing, eg_distance_matrix=None):
+def quality(eg_graph, eg_drawing, eg_distance_matrix=None, backend="egraph"):
+    if backend == "numpy":
+        n = eg_graph.node_count()
+        edges = graph_generator.egraph_edges(eg_graph=eg_graph)
+        adjacency = numpy_sgd.adjacency_matrix(
+            n=n, sources=edges[:, 0], targets=edges[:, 1]
+        )
+        return numpy_quality(
+            pos=drawing.from_egraph(eg_drawing=eg_drawing, n=n),
+            distance_matrix=const.EDGE_WEIGHT
+            * shortest_path(adjacency, method="D", unweighted=True),
+        )
     if eg_distance_matrix is None:
         eg_distance_matrix = all_sources_bfs(eg_graph, const.EDGE_WEIGHT)
     return -stress(eg_drawing, eg_distance_matrix)
+
+
+def numpy_quality(pos, distance_matrix):
+    return -sparse_stress.full_stress(pos=pos, distance_matrix=distance_matrix)
+
+
+def approximate_quality(pos, adjacency, number_of_pivots, seed=0):
+    value, error_bound = sparse_stress.pivot_stress(
+        pos=pos,
+        adjacency=adjacency,
+        number_of_pivots=number_of_pivots,
+        edge_weight=const.EDGE_WEIGHT,
+        rng=np.random.default_rng(seed),
+    )
+
+    return -value, error_bound
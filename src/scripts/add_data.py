@@ -1,19 +1,15 @@
 # Standard Library
 import argparse
-from itertools import product
+from contextlib import nullcontext
 
 # Third Party Library
 import optuna
-import pandas as pd
-from egraph import Coordinates, warshall_floyd
 from optuna.distributions import FloatDistribution, IntDistribution
 from tqdm import tqdm
 
 # First Party Library
-from config import const, dataset, layout, parameters, paths, quality_metrics
-from generators import graph as graph_generator
-from layouts import sgd
-from utils import graph, uuid
+from config import dataset, layout, paths, quality_metrics
+from utils import segment_store, trial_import
 
 
 def get_args():
@@ -32,47 +28,75 @@ if __name__ == "__main__":
     UUID = args.uuid
 
     P_NAMES = ["number_of_pivots", "number_of_iterations", "eps"]
+    DISTRIBUTIONS = {
+        "number_of_pivots": IntDistribution(0, 100),
+        "number_of_iterations": IntDistribution(1, 200),
+        "eps": FloatDistribution(0.01, 1),
+    }
 
     for L in layout.LAYOUT_NAMES:
-        for D in dataset.DATASET_NAMES:
+        for D in dataset.dataset_names:
             data_dir = paths.get_data_dir(
                 layout_name=L, dataset_name=D, uuid=UUID
             )
             if not data_dir.exists():
                 continue
 
-            df = pd.DataFrame()
+            grid_dir = data_dir.joinpath("grid")
+            grid_data_path = grid_dir.joinpath("20split")
+            legacy_paths = [
+                grid_dir.joinpath(f"20split-{i}.pkl") for i in range(4)
+            ]
 
-            for i in range(4):
-                grid_data_path = data_dir.joinpath("grid").joinpath(
-                    f"20split-{i}.pkl"
-                )
-                df = pd.concat([df, pd.read_pickle(grid_data_path)])
-            for qm_name in quality_metrics.ALL_QM_NAMES:
-                db_path = data_dir.joinpath("grid").joinpath("data.sql")
-                study = optuna.create_study(
-                    storage=f"sqlite:///{db_path.resolve()}",
+            db_path = grid_dir.joinpath("data.sql")
+            storage = optuna.storages.RDBStorage(
+                url=f"sqlite:///{db_path.resolve()}"
+            )
+            studies = {}
+            study_ids = {}
+            for qm_name in quality_metrics.qm_names:
+                studies[qm_name] = optuna.create_study(
+                    storage=storage,
                     study_name=qm_name,
                     direction=quality_metrics.QUALITY_METRICS_MAP[
                         qm_name
                     ].direction,
                     load_if_exists=True,
                 )
-                trials = []
-                for row in tqdm(df.itertuples()):
-                    params = row.params
-                    if "edge_length" in params:
-                        del params["edge_length"]
-                    qualities = row.qualities
+                study_ids[qm_name] = storage.get_study_id_from_name(qm_name)
 
-                    trial = optuna.trial.create_trial(
-                        params=params,
-                        distributions={
-                            "number_of_pivots": IntDistribution(0, 100),
-                            "number_of_iterations": IntDistribution(1, 200),
-                            "eps": FloatDistribution(0.01, 1),
-                        },
-                        value=qualities[qm_name],
+            # where supported, every metric study of a dataset is filled in
+            # one transaction
+            with (
+                storage.engine.begin()
+                if trial_import.supports_bulk_insert(storage)
+                else nullcontext()
+            ) as connection:
+                for df in tqdm(
+                    trial_import.iter_frames(
+                        store_path=grid_data_path, legacy_paths=legacy_paths
+                    ),
+                    desc=D,
+                    total=len(segment_store.read_manifest(grid_data_path))
+                    or len(legacy_paths),
+                ):
+                    params, qualities = trial_import.flatten(
+                        df=df,
+                        p_names=P_NAMES,
+                        qm_names=quality_metrics.qm_names,
                     )
-                    trials.append(trial)
-                study.add_trials(trials=trials)
+                    attrs = trial_import.user_attrs(df=df)
+                    for qm_name in quality_metrics.qm_names:
+                        trial_import.add_trials(
+                            study=studies[qm_name],
+                            study_id=study_ids[qm_name],
+                            trials=trial_import.create_trials(
+                                params=params,
+                                values=qualities[qm_name].to_numpy(
+                                    dtype="float64"
+                                ),
+                                distributions=DISTRIBUTIONS,
+                                user_attrs=attrs,
+                            ),
+                            connection=connection,
+                        )
@@ -0,0 +1,198 @@
+# Standard Library
+import argparse
+import json
+import multiprocessing
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Third Party Library
+from egraph import Coordinates, crossing_edges, warshall_floyd
+
+# First Party Library
+from config import const, dataset, parameters, paths
+from config.quality_metrics import QUALITY_METRICS_MAP, qm_names
+from generators import graph as graph_generator
+from layouts import sgd
+from utils import distance_matrix, graph, graph_bundle
+
+
+def get_args():
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument("--stem", required=True, help="report file stem")
+    parser.add_argument(
+        "-d",
+        choices=dataset.dataset_names,
+        nargs="*",
+        default=dataset.dataset_names,
+        help="dataset names",
+    )
+    parser.add_argument(
+        "--baseline", help="stem of the report to compare against"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="allowed relative slowdown against the baseline",
+    )
+    parser.add_argument(
+        "--max-warshall-floyd-nodes",
+        type=int,
+        default=2000,
+        help="skip warshall_floyd on larger graphs",
+    )
+
+    args = parser.parse_args()
+
+    return args
+
+
+def measure(f):
+    # ru_maxrss is in kilobytes on linux and only grows, so the peak of a
+    # step is reported along with how far the step raised it
+    start_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start_wall = time.perf_counter()
+    start_cpu = time.process_time()
+    result = f()
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    record = {
+        "wall": time.perf_counter() - start_wall,
+        "cpu": time.process_time() - start_cpu,
+        "peak_rss_kb": peak_rss,
+        "peak_rss_growth_kb": peak_rss - start_rss,
+    }
+
+    return result, record
+
+
+def benchmark_dataset(dataset_name, max_warshall_floyd_nodes):
+    steps = {}
+
+    def load_bundle():
+        nx_graph = graph.load_nx_graph(
+            dataset_path=paths.get_dataset_path(dataset_name=dataset_name)
+        )
+        nx_graph = graph.graph_preprocessing(
+            nx_graph=nx_graph, edge_weight=const.EDGE_WEIGHT
+        )
+        return graph_bundle.from_nx_graph(
+            nx_graph=nx_graph, edge_weight=const.EDGE_WEIGHT
+        )
+
+    bundle, steps["load_graph"] = measure(load_bundle)
+    (eg_graph, eg_indices), steps["egraph_graph"] = measure(
+        lambda: graph_generator.egraph_graph_from_bundle(bundle=bundle)
+    )
+    n = len(eg_indices)
+    m = len(bundle["sources"])
+
+    if n <= max_warshall_floyd_nodes:
+        _, steps["warshall_floyd"] = measure(
+            lambda: warshall_floyd(eg_graph, lambda _: const.EDGE_WEIGHT)
+        )
+    eg_distance_matrix, steps["all_sources_bfs"] = measure(
+        lambda: distance_matrix.egraph_distance_matrix(
+            eg_graph=eg_graph, edge_weight=const.EDGE_WEIGHT
+        )
+    )
+
+    eg_drawing = Coordinates.initial_placement(eg_graph)
+    params = {"edge_length": const.EDGE_WEIGHT, **parameters.empirical_ss}
+    _, steps["sgd"] = measure(
+        lambda: sgd.sgd(
+            eg_graph=eg_graph,
+            eg_indices=eg_indices,
+            eg_drawing=eg_drawing,
+            params=params,
+            seed=0,
+        )
+    )
+    eg_crossings, steps["crossing_edges"] = measure(
+        lambda: crossing_edges(eg_graph, eg_drawing)
+    )
+
+    context = {
+        "eg_graph": eg_graph,
+        "eg_drawing": eg_drawing,
+        "eg_crossings": eg_crossings,
+        "eg_distance_matrix": eg_distance_matrix,
+    }
+    for qm_name in qm_names:
+        qm = QUALITY_METRICS_MAP[qm_name]
+        args = {required: context[required] for required in qm.requires}
+        _, steps[f"qm:{qm_name}"] = measure(lambda: qm.quality(**args))
+
+    return {"n": n, "m": m, "steps": steps}
+
+
+def find_regressions(report, baseline, threshold):
+    regressions = []
+    for dataset_name, result in report["datasets"].items():
+        if dataset_name not in baseline["datasets"]:
+            continue
+        baseline_steps = baseline["datasets"][dataset_name]["steps"]
+        for step_name, record in result["steps"].items():
+            if step_name not in baseline_steps:
+                continue
+            baseline_wall = baseline_steps[step_name]["wall"]
+            if record["wall"] > baseline_wall * (1 + threshold):
+                regressions.append(
+                    f"{dataset_name} {step_name}: "
+                    f"{baseline_wall:.4f}s -> {record['wall']:.4f}s"
+                )
+
+    return regressions
+
+
+if __name__ == "__main__":
+    args = get_args()
+
+    STEM = args.stem
+    DATASET_NAMES = args.d
+    BASELINE = args.baseline
+    THRESHOLD = args.threshold
+    MAX_WARSHALL_FLOYD_NODES = args.max_warshall_floyd_nodes
+
+    report = {"datasets": {}}
+    for D in DATASET_NAMES:
+        # a fresh process per dataset, so that its peak rss is not one of
+        # the datasets before it
+        with ProcessPoolExecutor(
+            max_workers=1, mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            result = executor.submit(
+                benchmark_dataset,
+                dataset_name=D,
+                max_warshall_floyd_nodes=MAX_WARSHALL_FLOYD_NODES,
+            ).result()
+        report["datasets"][D] = result
+        print(
+            D,
+            f"n={result['n']} m={result['m']}",
+            " ".join(
+                [
+                    f"{step_name}={record['wall']:.4f}s"
+                    for step_name, record in result["steps"].items()
+                ]
+            ),
+        )
+
+    with paths.get_benchmark_path(filename=f"{STEM}.json").open(mode="w") as f:
+        json.dump(report, f, indent=2)
+
+    if BASELINE is not None:
+        with paths.get_benchmark_path(filename=f"{BASELINE}.json").open(
+            mode="r"
+        ) as f:
+            baseline = json.load(f)
+
+        regressions = find_regressions(
+            report=report, baseline=baseline, threshold=THRESHOLD
+        )
+        for regression in regressions:
+            print(f"regression {regression}")
+        if len(regressions) > 0:
+            sys.exit(1)
@@ -0,0 +1,151 @@
+# Standard Library
+import argparse
+import json
+import statistics
+import time
+
+# Third Party Library
+import numpy as np
+from egraph import Coordinates
+
+# First Party Library
+from config import const, dataset, parameters, paths
+from generators import graph as graph_generator
+from layouts import sgd
+from quality_metrics import ideal_edge_lengths, stress
+from utils import distance_matrix, graph_bundle
+
+
+def get_args():
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument("--stem", required=True, help="report file stem")
+    parser.add_argument(
+        "-d",
+        choices=dataset.dataset_names,
+        nargs="*",
+        default=dataset.dataset_names,
+        help="dataset names",
+    )
+    parser.add_argument(
+        "--pivots",
+        type=int,
+        nargs="*",
+        default=[10, 25, 50, 100],
+        help="numbers of pivots to calibrate",
+    )
+    parser.add_argument(
+        "--n-repeat",
+        type=int,
+        default=20,
+        help="n pivot samples per number of pivots",
+    )
+
+    args = parser.parse_args()
+
+    return args
+
+
+def calibrate_dataset(dataset_name, pivots, n_repeat):
+    bundle = graph_bundle.load(
+        dataset_name=dataset_name, edge_weight=const.EDGE_WEIGHT
+    )
+    eg_graph, eg_indices = graph_generator.egraph_graph_from_bundle(
+        bundle=bundle
+    )
+    adjacency = graph_bundle.adjacency_matrix(bundle=bundle)
+
+    eg_drawing = Coordinates.initial_placement(eg_graph)
+    pos = sgd.sgd(
+        eg_graph=eg_graph,
+        eg_indices=eg_indices,
+        eg_drawing=eg_drawing,
+        params={"edge_length": const.EDGE_WEIGHT, **parameters.empirical_ss},
+        seed=0,
+    )
+
+    start = time.perf_counter()
+    eg_distance_matrix = distance_matrix.egraph_distance_matrix(
+        eg_graph=eg_graph, edge_weight=const.EDGE_WEIGHT
+    )
+    exact = stress.quality(
+        eg_graph=eg_graph,
+        eg_drawing=eg_drawing,
+        eg_distance_matrix=eg_distance_matrix,
+    )
+    exact_time = time.perf_counter() - start
+
+    ideal_edge_lengths_error = abs(
+        ideal_edge_lengths.approximate_quality(
+            pos=pos,
+            edges=np.stack([bundle["sources"], bundle["targets"]], axis=1),
+        )[0]
+        - ideal_edge_lengths.quality(
+            eg_graph=eg_graph,
+            eg_drawing=eg_drawing,
+            eg_distance_matrix=eg_distance_matrix,
+        )
+    )
+
+    result = {
+        "n": len(eg_indices),
+        "exact": exact,
+        "exact_time": exact_time,
+        "ideal_edge_lengths_error": ideal_edge_lengths_error,
+        "pivots": {},
+    }
+    for number_of_pivots in pivots:
+        relative_errors = []
+        relative_bounds = []
+        covered = []
+        times = []
+        for seed in range(n_repeat):
+            start = time.perf_counter()
+            value, error_bound = stress.approximate_quality(
+                pos=pos,
+                adjacency=adjacency,
+                number_of_pivots=number_of_pivots,
+                seed=seed,
+            )
+            times.append(time.perf_counter() - start)
+            relative_errors.append(abs(value - exact) / abs(exact))
+            relative_bounds.append(error_bound / abs(exact))
+            covered.append(abs(value - exact) <= error_bound)
+
+        result["pivots"][number_of_pivots] = {
+            "mean_relative_error": statistics.mean(relative_errors),
+            "max_relative_error": max(relative_errors),
+            "mean_relative_bound": statistics.mean(relative_bounds),
+            "coverage": statistics.mean(covered),
+            "mean_time": statistics.mean(times),
+        }
+
+    return result
+
+
+if __name__ == "__main__":
+    args = get_args()
+
+    STEM = args.stem
+    DATASET_NAMES = args.d
+    PIVOTS = args.pivots
+    N_REPEAT = args.n_repeat
+
+    report = {"n_repeat": N_REPEAT, "datasets": {}}
+    for D in DATASET_NAMES:
+        result = calibrate_dataset(
+            dataset_name=D, pivots=PIVOTS, n_repeat=N_REPEAT
+        )
+        report["datasets"][D] = result
+        for number_of_pivots, record in result["pivots"].items():
+            print(
+                D,
+                f"n={result['n']} k={number_of_pivots}",
+                f"error={record['mean_relative_error']:.4f}",
+                f"bound={record['mean_relative_bound']:.4f}",
+                f"coverage={record['coverage']:.2f}",
+                f"time={record['mean_time']:.4f}s/{result['exact_time']:.4f}s",
+            )
+
+    with paths.get_benchmark_path(filename=f"{STEM}.json").open(mode="w") as f:
+        json.dump(report, f, indent=2)
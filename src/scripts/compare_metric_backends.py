@@ -0,0 +1,120 @@
+# Standard Library
+import argparse
+import json
+import math
+import sys
+import time
+
+# Third Party Library
+from egraph import Coordinates
+
+# First Party Library
+from config import const, dataset, parameters, paths
+from config.quality_metrics import QUALITY_METRICS_MAP
+from generators import graph as graph_generator
+from layouts import sgd
+from utils import graph_bundle
+from utils.quality_metrics import NUMPY_QM_NAMES
+
+
+def get_args():
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument("--stem", required=True, help="report file stem")
+    parser.add_argument(
+        "-d",
+        choices=dataset.dataset_names,
+        nargs="*",
+        default=dataset.dataset_names,
+        help="dataset names",
+    )
+    parser.add_argument(
+        "--rtol",
+        type=float,
+        default=1e-4,
+        help="allowed relative difference between the backends",
+    )
+
+    args = parser.parse_args()
+
+    return args
+
+
+def timed(f):
+    start = time.perf_counter()
+    result = f()
+
+    return result, time.perf_counter() - start
+
+
+def compare_dataset(dataset_name, rtol):
+    bundle = graph_bundle.load(
+        dataset_name=dataset_name, edge_weight=const.EDGE_WEIGHT
+    )
+    eg_graph, eg_indices = graph_generator.egraph_graph_from_bundle(
+        bundle=bundle
+    )
+    eg_drawing = Coordinates.initial_placement(eg_graph)
+    sgd.sgd(
+        eg_graph=eg_graph,
+        eg_indices=eg_indices,
+        eg_drawing=eg_drawing,
+        params={"edge_length": const.EDGE_WEIGHT, **parameters.empirical_ss},
+        seed=0,
+    )
+
+    result = {"n": len(eg_indices), "qualities": {}}
+    for qm_name in NUMPY_QM_NAMES:
+        qm = QUALITY_METRICS_MAP[qm_name]
+        record = {}
+        for backend in ["egraph", "numpy"]:
+            value, wall = timed(
+                lambda: qm.quality(
+                    eg_graph=eg_graph, eg_drawing=eg_drawing, backend=backend
+                )
+            )
+            record[backend] = {"value": value, "wall": wall}
+        record["parity"] = math.isclose(
+            record["egraph"]["value"],
+            record["numpy"]["value"],
+            rel_tol=rtol,
+            abs_tol=1e-9,
+        )
+        record["speedup"] = record["egraph"]["wall"] / max(
+            record["numpy"]["wall"], 1e-9
+        )
+        result["qualities"][qm_name] = record
+
+    return result
+
+
+if __name__ == "__main__":
+    args = get_args()
+
+    STEM = args.stem
+    DATASET_NAMES = args.d
+    RTOL = args.rtol
+
+    report = {"rtol": RTOL, "datasets": {}}
+    mismatches = []
+    for D in DATASET_NAMES:
+        result = compare_dataset(dataset_name=D, rtol=RTOL)
+        report["datasets"][D] = result
+        for qm_name, record in result["qualities"].items():
+            print(
+                D,
+                f"n={result['n']} {qm_name}",
+                f"egraph={record['egraph']['value']:.6g}",
+                f"numpy={record['numpy']['value']:.6g}",
+                f"speedup={record['speedup']:.1f}x",
+            )
+            if not record["parity"]:
+                mismatches.append(f"{D} {qm_name}")
+
+    with paths.get_benchmark_path(filename=f"{STEM}.json").open(mode="w") as f:
+        json.dump(report, f, indent=2)
+
+    for mismatch in mismatches:
+        print(f"mismatch {mismatch}")
+    if len(mismatches) > 0:
+        sys.exit(1)
@@ -0,0 +1,127 @@
+# Standard Library
+import argparse
+import json
+
+# First Party Library
+from config import const, dataset, parameters, paths, quality_metrics
+from generators import drawing_and_qualities
+from generators import graph as graph_generator
+from layouts import sgd
+from utils import distance_matrix, graph_bundle
+
+
+def get_args():
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument("--stem", required=True, help="report file stem")
+    parser.add_argument(
+        "-d",
+        choices=dataset.dataset_names,
+        nargs="*",
+        default=dataset.dataset_names,
+        help="dataset names",
+    )
+    parser.add_argument(
+        "-q",
+        choices=quality_metrics.qm_names,
+        nargs="*",
+        default=quality_metrics.qm_names,
+        help="quality metrics evaluated on every snapshot",
+    )
+    parser.add_argument(
+        "--number-of-iterations",
+        type=int,
+        default=sgd.PREFIX_ITERATIONS,
+        help="length of the traced run",
+    )
+    parser.add_argument(
+        "--every", type=int, default=None, help="snapshot every k steps"
+    )
+    parser.add_argument(
+        "--growth",
+        type=float,
+        default=None,
+        help="snapshot on a geometric schedule with this ratio",
+    )
+    parser.add_argument(
+        "--schedule",
+        choices=sgd.SCHEDULES,
+        default="prefix",
+        help="eta schedule",
+    )
+    parser.add_argument(
+        "--sgd-backend",
+        choices=sgd.BACKENDS,
+        default="egraph",
+        help="sgd implementation",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="seed")
+
+    args = parser.parse_args()
+
+    return args
+
+
+if __name__ == "__main__":
+    args = get_args()
+
+    STEM = args.stem
+    DATASET_NAMES = args.d
+    TARGET_QM_NAMES = args.q
+    NUMBER_OF_ITERATIONS = args.number_of_iterations
+    EVERY = args.every
+    GROWTH = args.growth
+    SCHEDULE = args.schedule
+    SGD_BACKEND = args.sgd_backend
+    SEED = args.seed
+
+    params = {
+        "edge_length": const.EDGE_WEIGHT,
+        **parameters.empirical_ss,
+        "number_of_iterations": NUMBER_OF_ITERATIONS,
+    }
+    steps = sgd.snapshot_steps(
+        number_of_iterations=NUMBER_OF_ITERATIONS, every=EVERY, growth=GROWTH
+    )
+
+    report = {
+        "params": params,
+        "seed": SEED,
+        "schedule": SCHEDULE,
+        "datasets": {},
+    }
+    for D in DATASET_NAMES:
+        bundle = graph_bundle.load(
+            dataset_name=D, edge_weight=const.EDGE_WEIGHT
+        )
+        eg_graph, eg_indices = graph_generator.egraph_graph_from_bundle(
+            bundle=bundle
+        )
+        eg_distance_matrix = distance_matrix.egraph_distance_matrix(
+            eg_graph=eg_graph, edge_weight=const.EDGE_WEIGHT
+        )
+
+        curve = drawing_and_qualities.convergence(
+            eg_graph=eg_graph,
+            eg_indices=eg_indices,
+            eg_distance_matrix=eg_distance_matrix,
+            params=params,
+            seed=SEED,
+            sgd_backend=SGD_BACKEND,
+            steps=steps,
+            schedule=SCHEDULE,
+            target_qm_names=TARGET_QM_NAMES,
+        )
+        report["datasets"][D] = [
+            {
+                "step": point["step"],
+                "qualities": point["qualities"],
+                "timings": point["timings"],
+            }
+            for point in curve
+        ]
+        for point in curve:
+            print(D, point["step"], point["qualities"])
+
+    with paths.get_benchmark_path(filename=f"{STEM}.json").open(mode="w") as f:
+        json.dump(report, f, indent=2)
@@ -0,0 +1,10 @@
+# Third Party Library
+from tqdm import tqdm
+
+# First Party Library
+from config import const, dataset
+from utils import graph_bundle
+
+if __name__ == "__main__":
+    for D in tqdm(dataset.dataset_names):
+        graph_bundle.load(dataset_name=D, edge_weight=const.EDGE_WEIGHT)
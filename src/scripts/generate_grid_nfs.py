@@ -1,47 +1,161 @@
 # Standard Library
 import argparse
+from functools import partial
 from itertools import product
+from multiprocessing import Pool
 
 # Third Party Library
-import pandas as pd
-from egraph import Coordinates, warshall_floyd
 from tqdm import tqdm
 
 # First Party Library
-from config import const, dataset, layout, parameters, paths, quality_metrics
-from generators import graph as graph_generator
+from config import const, dataset, layout, parameters, paths
+from generators import drawing_and_qualities
 from layouts import sgd
-from utils import graph, uuid
-from utils.quality_metrics import measure_qualities
-
-
-def save(params_id, seed, params, qualities, path):
-    data_id = uuid.get_uuid()
-    base_df = pd.DataFrame()
-    if path.exists():
-        base_df = pd.read_pickle(path)
-
-    new_df = pd.DataFrame(
-        [
-            {
-                "id": data_id,
-                "params_id": params_id,
-                "seed": seed,
-                "params": params,
-                "qualities": qualities,
-            }
-        ]
+from utils import (
+    evaluation_store,
+    graph_bundle,
+    save,
+    segment_store,
+    shared_arrays,
+    uuid,
+)
+from utils.quality_metrics import METRIC_BACKENDS
+
+P_NAMES = ["number_of_pivots", "number_of_iterations", "eps"]
+
+
+def grid_key(params, seed):
+    return tuple([params[p_name] for p_name in P_NAMES] + [seed])
+
+
+def cost(params):
+    # every iteration of sparse sgd visits about n * number_of_pivots pairs
+    return params["number_of_pivots"] * params["number_of_iterations"]
+
+
+def group_by_iterations(tasks):
+    # grid points that differ only in number_of_iterations share one run
+    groups = {}
+    for params, seed in tasks:
+        key = (params["number_of_pivots"], params["eps"], seed)
+        if key not in groups:
+            groups[key] = (params, seed, [])
+        groups[key][2].append(params["number_of_iterations"])
+
+    return [
+        (
+            {**params, "number_of_iterations": max(steps)},
+            seed,
+            sorted(steps),
+        )
+        for params, seed, steps in groups.values()
+    ]
+
+
+def evaluate(task):
+    params, seed = task
+    _, qualities, _ = drawing_and_qualities.ss_in_worker(
+        params=params, seed=seed
     )
 
-    df = pd.concat([base_df, new_df])
-    df.to_pickle(path)
+    return [(params, seed, qualities)]
+
+
+def evaluate_convergence(task):
+    params, seed, steps = task
+    curve = drawing_and_qualities.convergence_in_worker(
+        params=params, seed=seed, steps=steps, schedule="prefix"
+    )
+
+    return [
+        (
+            {**params, "number_of_iterations": point["step"]},
+            seed,
+            point["qualities"],
+        )
+        for point in curve
+    ]
+
+
+def evaluate_grid(
+    bundle,
+    tasks,
+    evaluate_task,
+    grid_data_path,
+    buffer,
+    store,
+    n_jobs,
+    metric_backend,
+    pivot_cache,
+):
+    handle, blocks = drawing_and_qualities.share_bundle(
+        bundle=bundle,
+        edge_weight=const.EDGE_WEIGHT,
+        metric_backend=metric_backend,
+    )
+    try:
+        with Pool(
+            processes=n_jobs,
+            initializer=partial(
+                drawing_and_qualities.init_worker,
+                metric_backend=metric_backend,
+                shared=True,
+                pivot_cache=pivot_cache,
+            ),
+            initargs=(handle, const.EDGE_WEIGHT),
+        ) as pool:
+            # only this process writes, so every result is saved once
+            for results in tqdm(
+                pool.imap_unordered(evaluate_task, tasks), total=len(tasks)
+            ):
+                for params, seed, qualities in results:
+                    save.grid(
+                        params_id=uuid.get_uuid(),
+                        seed=seed,
+                        params=params,
+                        qualities=qualities,
+                        grid_path=grid_data_path,
+                        buffer=buffer,
+                    )
+                    evaluation_store.add(
+                        store=store,
+                        params=params,
+                        seed=seed,
+                        qualities=qualities,
+                    )
+    finally:
+        # what an interrupted run evaluated is kept
+        segment_store.flush(buffer)
+        evaluation_store.flush(store)
+        shared_arrays.release(blocks=blocks, unlink=True)
 
 
 def get_args():
     parser = argparse.ArgumentParser()
 
-    parser.add_argument("--n-slice", type=int, required=True, help="n slice")
     parser.add_argument("--uuid", required=True, help="uuid")
+    parser.add_argument(
+        "--n-jobs", type=int, required=True, help="number of jobs"
+    )
+    parser.add_argument(
+        "--schedule",
+        choices=sgd.SCHEDULES,
+        default="exponential",
+        help="eta schedule, prefix answers every number_of_iterations of a "
+        "grid point from one traced run",
+    )
+    parser.add_argument(
+        "--metric-backend",
+        choices=METRIC_BACKENDS,
+        default="egraph",
+        help="implementation of the geometric quality metrics",
+    )
+    parser.add_argument(
+        "--pivot-cache",
+        action="store_true",
+        help="reuse the pivots chosen for a seed across grid points, which "
+        "draws with other pivot orders than the other scripts",
+    )
 
     args = parser.parse_args()
 
@@ -50,12 +164,14 @@ def get_args():
 
 if __name__ == "__main__":
     args = get_args()
-    N_SLICE = args.n_slice
-
     UUID = args.uuid
+    N_JOBS = args.n_jobs
+    SCHEDULE = args.schedule
+    METRIC_BACKEND = args.metric_backend
+    PIVOT_CACHE = args.pivot_cache
 
-    P_NAMES = ["number_of_pivots", "number_of_iterations", "eps"]
     N_SPLIT = 20
+    SEED = 0
 
     params_steps = {
         "number_of_pivots": 5,
@@ -92,47 +208,86 @@ if __name__ == "__main__":
             if not data_dir.exists():
                 continue
 
-            dataset_path = paths.get_dataset_path(dataset_name=D)
-
-            nx_graph = graph.load_nx_graph(
+            bundle = graph_bundle.load(
                 dataset_name=D, edge_weight=const.EDGE_WEIGHT
             )
-            eg_graph, eg_indices = graph_generator.egraph_graph(
-                nx_graph=nx_graph
-            )
-            eg_distance_matrix = warshall_floyd(
-                eg_graph, lambda _: const.EDGE_WEIGHT
-            )
 
-            grid_data_path = data_dir.joinpath("grid").joinpath(
-                f"{N_SPLIT}split-{N_SLICE}.pkl"
-            )
-            grid_data_path.parent.mkdir(exist_ok=True)
-            n = len(params_list) // 4
-            for params in tqdm(params_list[n * N_SLICE : n * (N_SLICE + 1)]):
-                print(params)
-                params_id = uuid.get_uuid()
-                seed = 0
-                eg_drawing = Coordinates.initial_placement(eg_graph)
-
-                pos = sgd.sgd(
-                    eg_graph=eg_graph,
-                    eg_indices=eg_indices,
-                    eg_drawing=eg_drawing,
-                    params=params,
-                    seed=seed,
+            # runs on the prefix schedule or with cached pivots are kept
+            # apart from the others
+            grid_name = f"{N_SPLIT}split"
+            if SCHEDULE != "exponential":
+                grid_name = f"{grid_name}-{SCHEDULE}"
+            if PIVOT_CACHE:
+                grid_name = f"{grid_name}-pivot-cache"
+            grid_data_path = data_dir.joinpath("grid").joinpath(grid_name)
+
+            # skip what an interrupted run already wrote
+            done_keys = {
+                grid_key(params=row["params"], seed=row["seed"])
+                for row in segment_store.iter_rows(grid_data_path)
+            }
+            tasks = [
+                (params, SEED)
+                for params in params_list
+                if grid_key(params=params, seed=SEED) not in done_keys
+            ]
+
+            # evaluations another script or study already made are reused
+            store = evaluation_store.open_store(
+                evaluation_store.get_store_path(
+                    dataset_name=D,
+                    metric_backend=METRIC_BACKEND,
+                    schedule=SCHEDULE,
+                    pivot_cache=PIVOT_CACHE,
                 )
-                qualities = measure_qualities(
-                    target_qm_names=quality_metrics.ALL_QM_NAMES,
-                    eg_graph=eg_graph,
-                    eg_drawing=eg_drawing,
-                    eg_distance_matrix=eg_distance_matrix,
+            )
+            evaluation_store.refresh(store)
+            lookups = [
+                (
+                    params,
+                    seed,
+                    evaluation_store.lookup(
+                        store=store, params=params, seed=seed
+                    ),
                 )
-
-                save(
-                    params_id=params_id,
+                for params, seed in tasks
+            ]
+            cached = [task for task in lookups if task[2] is not None]
+            tasks = [
+                (params, seed)
+                for params, seed, qualities in lookups
+                if qualities is None
+            ]
+            # rows are written a batch at a time and merged into one segment
+            # once the grid is done
+            buffer = segment_store.open_buffer(grid_data_path)
+            for params, seed, qualities in cached:
+                save.grid(
+                    params_id=uuid.get_uuid(),
                     seed=seed,
                     params=params,
                     qualities=qualities,
-                    path=grid_data_path,
+                    grid_path=grid_data_path,
+                    buffer=buffer,
                 )
+
+            evaluate_task = evaluate
+            if SCHEDULE == "prefix":
+                tasks = group_by_iterations(tasks)
+                evaluate_task = evaluate_convergence
+
+            # expensive tasks first so no worker is left with a long tail
+            tasks.sort(key=lambda task: cost(task[0]), reverse=True)
+
+            evaluate_grid(
+                bundle=bundle,
+                tasks=tasks,
+                evaluate_task=evaluate_task,
+                grid_data_path=grid_data_path,
+                buffer=buffer,
+                store=store,
+                n_jobs=N_JOBS,
+                metric_backend=METRIC_BACKEND,
+                pivot_cache=PIVOT_CACHE,
+            )
+            segment_store.compact(grid_data_path)
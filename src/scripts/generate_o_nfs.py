@@ -4,14 +4,21 @@ import random
 
 # Third Party Library
 import optuna
-from egraph import Coordinates, warshall_floyd
+from egraph import Coordinates
 from tqdm import trange
 
 # First Party Library
 from config import const, dataset, layout, paths, quality_metrics
 from generators import graph as graph_generator
 from layouts import sgd
-from utils import graph, save, uuid
+from utils import (
+    distance_matrix,
+    graph_bundle,
+    position_archive,
+    save,
+    segment_store,
+    uuid,
+)
 from utils.quality_metrics import measure_qualities
 
 
@@ -27,6 +34,12 @@ def get_args():
         "-l", choices=layout.LAYOUT_NAMES, required=True, help="layout name"
     )
     parser.add_argument("--n-seed", type=int, required=True, help="n seed")
+    parser.add_argument(
+        "--pos-codec",
+        choices=["side", *position_archive.CODECS],
+        default="float32",
+        help="where drawings go, side files or a position archive",
+    )
     parser.add_argument(
         "-t",
         choices=quality_metrics.ALL_QM_NAMES,
@@ -48,19 +61,16 @@ if __name__ == "__main__":
     D = args.d
     L = args.l
     N_SEED = args.n_seed
+    POS_CODEC = None if args.pos_codec == "side" else args.pos_codec
     TARGET_QM_NAMES = sorted(args.t)
 
-    filename = f"op-{N_SEED}nfs-{','.join(TARGET_QM_NAMES)}-{DB_STEM}.pkl"
-
-    dataset_path = paths.get_dataset_path(dataset_name=D)
+    filename = f"op-{N_SEED}nfs-{','.join(TARGET_QM_NAMES)}-{DB_STEM}"
 
     o_nfs_path = paths.get_o_nfs_path(
         dataset_name=D, layout_name=L, filename=filename, uuid=UUID
     )
 
-    nx_graph = graph.load_nx_graph(
-        dataset_name=D, edge_weight=const.EDGE_WEIGHT
-    )
+    bundle = graph_bundle.load(dataset_name=D, edge_weight=const.EDGE_WEIGHT)
 
     database_name = f"{DB_STEM}.sql"
     optimization_path = paths.get_optimization_path(
@@ -69,9 +79,11 @@ if __name__ == "__main__":
     database_uri = f"sqlite:///{optimization_path.resolve()}"
 
     if L == layout.SS:
-        eg_graph, eg_indices = graph_generator.egraph_graph(nx_graph=nx_graph)
-        eg_distance_matrix = warshall_floyd(
-            eg_graph, lambda _: const.EDGE_WEIGHT
+        eg_graph, eg_indices = graph_generator.egraph_graph_from_bundle(
+            bundle=bundle
+        )
+        eg_distance_matrix = distance_matrix.egraph_distance_matrix(
+            eg_graph=eg_graph, edge_weight=const.EDGE_WEIGHT
         )
 
         params_id = uuid.get_uuid()
@@ -80,30 +92,36 @@ if __name__ == "__main__":
         )
         params = study.best_trial.user_attrs["params"]
 
-        for _ in trange(N_SEED):
-            seed = random.randint(0, const.RAND_MAX)
-            eg_drawing = Coordinates.initial_placement(eg_graph)
-
-            pos = sgd.sgd(
-                eg_graph=eg_graph,
-                eg_indices=eg_indices,
-                eg_drawing=eg_drawing,
-                params=params,
-                seed=seed,
-            )
-            qualities = measure_qualities(
-                target_qm_names=quality_metrics.ALL_QM_NAMES,
-                eg_graph=eg_graph,
-                eg_drawing=eg_drawing,
-                eg_distance_matrix=eg_distance_matrix,
-            )
-
-            save.o_nfs(
-                params_id=params_id,
-                target_qm_names=TARGET_QM_NAMES,
-                seed=seed,
-                params=params,
-                qualities=qualities,
-                pos=pos,
-                o_nfs_path=o_nfs_path,
-            )
+        # rows are written a batch at a time and merged into one segment
+        # once the run is done
+        with segment_store.buffered(o_nfs_path) as buffer:
+            for _ in trange(N_SEED):
+                seed = random.randint(0, const.RAND_MAX)
+                eg_drawing = Coordinates.initial_placement(eg_graph)
+
+                pos = sgd.sgd(
+                    eg_graph=eg_graph,
+                    eg_indices=eg_indices,
+                    eg_drawing=eg_drawing,
+                    params=params,
+                    seed=seed,
+                )
+                qualities = measure_qualities(
+                    target_qm_names=quality_metrics.ALL_QM_NAMES,
+                    eg_graph=eg_graph,
+                    eg_drawing=eg_drawing,
+                    eg_distance_matrix=eg_distance_matrix,
+                )
+
+                save.o_nfs(
+                    params_id=params_id,
+                    target_qm_names=TARGET_QM_NAMES,
+                    seed=seed,
+                    params=params,
+                    qualities=qualities,
+                    pos=pos,
+                    o_nfs_path=o_nfs_path,
+                    pos_codec=POS_CODEC,
+                    buffer=buffer,
+                )
+        segment_store.compact(o_nfs_path)
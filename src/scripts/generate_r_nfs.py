@@ -3,14 +3,21 @@ import argparse
 import random
 
 # Third Party Library
-from egraph import Coordinates, warshall_floyd
+from egraph import Coordinates
 from tqdm import trange
 
 # First Party Library
 from config import const, dataset, layout, parameters, paths, quality_metrics
 from generators import graph as graph_generator
 from layouts import sgd
-from utils import graph, save, uuid
+from utils import (
+    distance_matrix,
+    graph_bundle,
+    position_archive,
+    save,
+    segment_store,
+    uuid,
+)
 from utils.quality_metrics import measure_qualities
 
 
@@ -27,6 +34,12 @@ def get_args():
     )
     parser.add_argument("--n-params", type=int, required=True, help="n params")
     parser.add_argument("--n-seed", type=int, required=True, help="n seed")
+    parser.add_argument(
+        "--pos-codec",
+        choices=["side", *position_archive.CODECS],
+        default="float32",
+        help="where drawings go, side files or a position archive",
+    )
 
     args = parser.parse_args()
 
@@ -42,66 +55,71 @@ if __name__ == "__main__":
     L = args.l
     N_PARAMS = args.n_params
     N_SEED = args.n_seed
+    POS_CODEC = None if args.pos_codec == "side" else args.pos_codec
 
-    filename = f"{STEM}.pkl"
-
-    dataset_path = paths.get_dataset_path(dataset_name=D)
+    filename = STEM
 
     r_nfs_path = paths.get_r_nfs_path(
         dataset_name=D, layout_name=L, filename=filename, uuid=UUID
     )
 
-    nx_graph = graph.load_nx_graph(
-        dataset_name=D, edge_weight=const.EDGE_WEIGHT
-    )
+    bundle = graph_bundle.load(dataset_name=D, edge_weight=const.EDGE_WEIGHT)
 
     if L == layout.SS:
-        eg_graph, eg_indices = graph_generator.egraph_graph(nx_graph=nx_graph)
-        eg_distance_matrix = warshall_floyd(
-            eg_graph, lambda _: const.EDGE_WEIGHT
+        eg_graph, eg_indices = graph_generator.egraph_graph_from_bundle(
+            bundle=bundle
+        )
+        eg_distance_matrix = distance_matrix.egraph_distance_matrix(
+            eg_graph=eg_graph, edge_weight=const.EDGE_WEIGHT
         )
 
-        for _ in trange(N_PARAMS):
-            params_id = uuid.get_uuid()
-            params = {
-                "edge_length": const.EDGE_WEIGHT,
-                "number_of_pivots": random.randint(
-                    parameters.domain_ss["number_of_pivots"]["l"],
-                    parameters.domain_ss["number_of_pivots"]["u"],
-                ),
-                "number_of_iterations": random.randint(
-                    parameters.domain_ss["number_of_iterations"]["l"],
-                    parameters.domain_ss["number_of_iterations"]["u"],
-                ),
-                "eps": random.uniform(
-                    parameters.domain_ss["eps"]["l"],
-                    parameters.domain_ss["eps"]["u"],
-                ),
-            }
-
-            for _ in trange(N_SEED):
-                seed = random.randint(0, const.RAND_MAX)
-                eg_drawing = Coordinates.initial_placement(eg_graph)
-
-                pos = sgd.sgd(
-                    eg_graph=eg_graph,
-                    eg_indices=eg_indices,
-                    eg_drawing=eg_drawing,
-                    params=params,
-                    seed=seed,
-                )
-                qualities = measure_qualities(
-                    target_qm_names=quality_metrics.ALL_QM_NAMES,
-                    eg_graph=eg_graph,
-                    eg_drawing=eg_drawing,
-                    eg_distance_matrix=eg_distance_matrix,
-                )
-
-                save.r_nfs(
-                    params_id=params_id,
-                    seed=seed,
-                    params=params,
-                    qualities=qualities,
-                    pos=pos,
-                    r_nfs_path=r_nfs_path,
-                )
+        # rows are written a batch at a time and merged into one segment
+        # once the run is done
+        with segment_store.buffered(r_nfs_path) as buffer:
+            for _ in trange(N_PARAMS):
+                params_id = uuid.get_uuid()
+                params = {
+                    "edge_length": const.EDGE_WEIGHT,
+                    "number_of_pivots": random.randint(
+                        parameters.domain_ss["number_of_pivots"]["l"],
+                        parameters.domain_ss["number_of_pivots"]["u"],
+                    ),
+                    "number_of_iterations": random.randint(
+                        parameters.domain_ss["number_of_iterations"]["l"],
+                        parameters.domain_ss["number_of_iterations"]["u"],
+                    ),
+                    "eps": random.uniform(
+                        parameters.domain_ss["eps"]["l"],
+                        parameters.domain_ss["eps"]["u"],
+                    ),
+                }
+
+                for _ in trange(N_SEED):
+                    seed = random.randint(0, const.RAND_MAX)
+                    eg_drawing = Coordinates.initial_placement(eg_graph)
+
+                    pos = sgd.sgd(
+                        eg_graph=eg_graph,
+                        eg_indices=eg_indices,
+                        eg_drawing=eg_drawing,
+                        params=params,
+                        seed=seed,
+                    )
+                    qualities = measure_qualities(
+                        target_qm_names=quality_metrics.ALL_QM_NAMES,
+                        eg_graph=eg_graph,
+                        eg_drawing=eg_drawing,
+                        eg_distance_matrix=eg_distance_matrix,
+                    )
+
+                    save.r_nfs(
+                        params_id=params_id,
+                        seed=seed,
+                        params=params,
+                        qualities=qualities,
+                        pos=pos,
+                        r_nfs_path=r_nfs_path,
+                        pos_codec=POS_CODEC,
+                        buffer=buffer,
+                    )
+        segment_store.compact(r_nfs_path)
@@ -8,8 +8,10 @@ import optuna
 
 # First Party Library
 from config import const, dataset, layout, paths, quality_metrics
-from optimizers import objective
-from utils import graph
+from layouts import sgd
+from optimizers import objective, pruners
+from utils import evaluation_store, graph_bundle, tracing
+from utils.quality_metrics import METRIC_BACKENDS
 
 
 def get_args():
@@ -37,6 +39,57 @@ def get_args():
         choices=["normal", "mean", "median"],
         help="how to handle multiple seed",
     )
+    parser.add_argument(
+        "--n-seed-jobs",
+        type=int,
+        default=1,
+        help="n processes evaluating seeds of a trial in parallel",
+    )
+    parser.add_argument(
+        "--sgd-backend",
+        choices=sgd.BACKENDS,
+        default="egraph",
+        help="sgd implementation",
+    )
+    parser.add_argument(
+        "--pruner",
+        choices=pruners.PRUNER_NAMES,
+        default="none",
+        help="how to stop hopeless trials early",
+    )
+    parser.add_argument(
+        "--iteration-budgets",
+        type=int,
+        nargs="*",
+        default=[],
+        help="percentages of number_of_iterations evaluated before full runs",
+    )
+    parser.add_argument(
+        "--stress-pivots",
+        type=int,
+        help="estimate stress from this many pivot rows instead of all pairs",
+    )
+    parser.add_argument(
+        "--crossing-relative-error",
+        type=float,
+        help="estimate crossings by sampling edge pairs to this error",
+    )
+    parser.add_argument(
+        "--metric-backend",
+        choices=METRIC_BACKENDS,
+        default="egraph",
+        help="implementation of the geometric quality metrics",
+    )
+    parser.add_argument(
+        "--no-evaluation-store",
+        action="store_true",
+        help="do not share evaluations with other studies and scripts",
+    )
+    parser.add_argument(
+        "--trace",
+        action="store_true",
+        help="record spans into user attrs and a chrome trace file",
+    )
     parser.add_argument(
         "-t",
         choices=quality_metrics.qm_names,
@@ -50,6 +103,70 @@ def get_args():
     return args
 
 
+def check_args(args):
+    if args.fixed_seed and 1 != args.n_seed:
+        raise ValueError("n seed must be 1 when seed fixed")
+
+    if args.handle_result == "normal" and (1 != args.n_seed):
+        raise ValueError("n seed must be 1 when handle result is normal")
+
+    if args.handle_result != "normal" and (1 == args.n_seed):
+        raise ValueError(
+            "n seed must be greater than 1 when handle result is not normal"
+        )
+
+    if any(
+        [budget <= 0 or 100 <= budget for budget in args.iteration_budgets]
+    ):
+        raise ValueError("iteration budgets must be between 0 and 100")
+
+    single_target_pruners = ["median", "successive_halving", "hyperband"]
+    if args.pruner in single_target_pruners and 1 != len(args.t):
+        raise ValueError(
+            f"{args.pruner} pruner needs exactly one target quality metric"
+        )
+
+
+def get_result_handler(handle_result):
+    def result_handler(result):
+        qualities_result = {}
+        for qm_name in quality_metrics.qm_names:
+            if handle_result == "normal":
+                qualities_result[qm_name] = result[qm_name][0]
+            elif handle_result == "mean":
+                qualities_result[qm_name] = statistics.mean(result[qm_name])
+            elif handle_result == "median":
+                qualities_result[qm_name] = statistics.median(result[qm_name])
+
+        return qualities_result
+
+    return result_handler
+
+
+def create_study(
+    database_uri,
+    study_name,
+    target_qm_names,
+    pruner,
+    iteration_budgets,
+    n_seed,
+):
+    return optuna.create_study(
+        directions=[
+            quality_metrics.QUALITY_METRICS_MAP[qm_name].direction
+            for qm_name in target_qm_names
+        ],
+        storage=database_uri,
+        study_name=study_name,
+        pruner=pruners.create_pruner(
+            pruner_name=pruner,
+            min_resource=iteration_budgets[0] if iteration_budgets else 1,
+            max_resource=100 if iteration_budgets else n_seed,
+        ),
+        load_if_exists=True,
+    )
+
+
 if __name__ == "__main__":
     args = get_args()
 
@@ -61,18 +178,18 @@ if __name__ == "__main__":
     N_SEED = args.n_seed
     HANDLE_RESULT = args.handle_result
     FIXED_SEED = args.fixed_seed
+    N_SEED_JOBS = args.n_seed_jobs
+    SGD_BACKEND = args.sgd_backend
+    PRUNER = args.pruner
+    ITERATION_BUDGETS = sorted(args.iteration_budgets)
+    STRESS_PIVOTS = args.stress_pivots
+    CROSSING_RELATIVE_ERROR = args.crossing_relative_error
+    METRIC_BACKEND = args.metric_backend
+    EVALUATION_STORE = not args.no_evaluation_store
+    TRACE = args.trace
     TARGET_QM_NAMES = sorted(args.t)
 
-    if FIXED_SEED and 1 != N_SEED:
-        raise ValueError("n seed must be 1 when seed fixed")
-
-    if HANDLE_RESULT == "normal" and (1 != N_SEED):
-        raise ValueError("n seed must be 1 when handle result is normal")
-
-    if HANDLE_RESULT != "normal" and (1 == N_SEED):
-        raise ValueError(
-            "n seed must be greater than 1 when handle result is not normal"
-        )
+    check_args(args)
 
     db_name = f"{STEM}.sql"
     optimization_path = paths.get_optimization_path(
@@ -87,47 +204,61 @@ if __name__ == "__main__":
 
         return seed
 
-    def result_handler(result):
-        qualities_result = {}
-        for qm_name in quality_metrics.qm_names:
-            if HANDLE_RESULT == "normal":
-                qualities_result[qm_name] = result[qm_name][0]
-            elif HANDLE_RESULT == "mean":
-                qualities_result[qm_name] = statistics.mean(result[qm_name])
-            elif HANDLE_RESULT == "median":
-                qualities_result[qm_name] = statistics.median(result[qm_name])
-
-        return qualities_result
+    if TRACE:
+        tracing.enable()
 
-    nx_graph = graph.load_nx_graph(
-        dataset_path=f"submodules/js/dataset/{D}.json"
-    )
-    nx_graph = graph.graph_preprocessing(
-        nx_graph=nx_graph, edge_weight=const.EDGE_WEIGHT
-    )
-    # nx_graph = graph.load_nx_graph(
-    #     dataset_name=D, edge_weight=const.EDGE_WEIGHT
-    # )
+    bundle = graph_bundle.load(dataset_name=D, edge_weight=const.EDGE_WEIGHT)
 
-    study = optuna.create_study(
-        directions=[
-            quality_metrics.QUALITY_METRICS_MAP[qm_name].direction
-            for qm_name in TARGET_QM_NAMES
-        ],
-        storage=database_uri,
+    study = create_study(
+        database_uri=database_uri,
         study_name=study_name,
-        load_if_exists=True,
+        target_qm_names=TARGET_QM_NAMES,
+        pruner=PRUNER,
+        iteration_budgets=ITERATION_BUDGETS,
+        n_seed=N_SEED,
     )
 
-    study.optimize(
-        func=objective.ss(
-            nx_graph=nx_graph,
-            target_qm_names=TARGET_QM_NAMES,
-            edge_weight=const.EDGE_WEIGHT,
-            n_seed=N_SEED,
-            result_handler=result_handler,
-            generate_seed=generate_seed,
-        ),
-        n_trials=N_TRIALS,
-        show_progress_bar=True,
-    )
+    with objective.workers(
+        bundle=bundle,
+        edge_weight=const.EDGE_WEIGHT,
+        n_jobs=N_SEED_JOBS,
+        n_seed=N_SEED,
+        sgd_backend=SGD_BACKEND,
+        stress_pivots=STRESS_PIVOTS,
+        crossing_relative_error=CROSSING_RELATIVE_ERROR,
+        metric_backend=METRIC_BACKEND,
+    ) as executor:
+        study.optimize(
+            func=objective.ss(
+                target_qm_names=TARGET_QM_NAMES,
+                edge_weight=const.EDGE_WEIGHT,
+                n_seed=N_SEED,
+                result_handler=get_result_handler(HANDLE_RESULT),
+                generate_seed=generate_seed,
+                executor=executor,
+                dominance_pruning=PRUNER == "dominance",
+                iteration_budgets=ITERATION_BUDGETS,
+                evaluation_store_path=(
+                    evaluation_store.get_store_path(
+                        dataset_name=D,
+                        sgd_backend=SGD_BACKEND,
+                        stress_pivots=STRESS_PIVOTS,
+                        crossing_relative_error=CROSSING_RELATIVE_ERROR,
+                        metric_backend=METRIC_BACKEND,
+                    )
+                    if EVALUATION_STORE
+                    else None
+                ),
+            ),
+            n_trials=N_TRIALS,
+            show_progress_bar=True,
+        )
+
+    if TRACE:
+        trace_path = paths.get_optimization_path(
+            layout_name=L,
+            dataset_name=D,
+            filename=f"{STEM}.trace.json",
+            uuid=UUID,
+        )
+        tracing.export_chrome_trace(path=trace_path)
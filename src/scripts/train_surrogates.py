@@ -0,0 +1,80 @@
+# Standard Library
+import argparse
+
+# Third Party Library
+import numpy as np
+from sklearn.metrics import r2_score
+from sklearn.model_selection import train_test_split
+
+# First Party Library
+from config import dataset, layout, paths, quality_metrics
+from optimizers import surrogate
+
+
+def get_args():
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument("--uuid", required=True, help="uuid")
+    parser.add_argument(
+        "--model",
+        choices=surrogate.MODEL_NAMES,
+        default="lightgbm",
+        help="regressor",
+    )
+
+    args = parser.parse_args()
+
+    return args
+
+
+if __name__ == "__main__":
+    args = get_args()
+
+    UUID = args.uuid
+    MODEL = args.model
+
+    for L in layout.LAYOUT_NAMES:
+        for D in dataset.dataset_names:
+            data_dir = paths.get_data_dir(
+                layout_name=L, dataset_name=D, uuid=UUID
+            )
+            if not data_dir.joinpath("grid").exists():
+                continue
+
+            df = surrogate.load_grid_df(data_dir=data_dir)
+            train_df, test_df = train_test_split(
+                df, test_size=0.2, random_state=0
+            )
+
+            # the held out split only scores the models, the saved ones are
+            # fit on the whole grid
+            models = surrogate.train(
+                df=train_df,
+                qm_names=quality_metrics.qm_names,
+                model_name=MODEL,
+            )
+            predictions = surrogate.predict(
+                models=models,
+                params=surrogate.params_array(test_df["params"]),
+            )
+            for qm_name in quality_metrics.qm_names:
+                y = np.array(
+                    [qualities[qm_name] for qualities in test_df["qualities"]]
+                )
+                r2 = r2_score(y, predictions[qm_name])
+                print(f"{L} {D} {qm_name} r2={r2:.4f}")
+
+            models = surrogate.train(
+                df=df,
+                qm_names=quality_metrics.qm_names,
+                model_name=MODEL,
+            )
+            surrogate.save(
+                models=models,
+                path=paths.get_surrogate_path(
+                    layout_name=L,
+                    dataset_name=D,
+                    filename=f"{MODEL}.pkl",
+                    uuid=UUID,
+                ),
+            )
@@ -0,0 +1,65 @@
+# Third Party Library
+import numpy as np
+
+# First Party Library
+from utils.edge_crossing_finder import crossing_pairs
+
+# every function takes a drawing of shape (n, 2) or a batch of drawings of
+# shape (b, n, 2) whose rows follow the same node indices
+
+
+def _batch(pos):
+    pos = np.asarray(pos, dtype=np.float64)
+
+    return pos.reshape(-1, *pos.shape[-2:]), pos.ndim == 2
+
+
+def angular_resolution(pos, indptr, indices):
+    batch, single = _batch(pos)
+    n = batch.shape[1]
+    degrees = np.diff(indptr)
+    sources = np.repeat(np.arange(n), degrees)
+    if len(sources) == 0:
+        return 0.0 if single else np.zeros(len(batch))
+
+    delta = batch[:, indices] - batch[:, sources]
+    angles = np.arctan2(delta[:, :, 1], delta[:, :, 0]) + np.pi
+
+    # sorting by node first and angle second keeps the rows of the csr
+    # segments together, angles + pi lie in [0, 2 pi] < 8
+    order = np.argsort(sources * 8.0 + angles, axis=1, kind="stable")
+    angles = np.take_along_axis(angles, order, axis=1)
+
+    gaps = np.diff(angles, axis=1)
+    same_node = sources[1:] == sources[:-1]
+    values = np.where(same_node, np.exp(-gaps), 0.0).sum(axis=1)
+
+    # the gap from the last edge of a node around to its first one
+    starts = indptr[:-1][degrees > 1]
+    ends = indptr[1:][degrees > 1] - 1
+    wrap = 2 * np.pi - (angles[:, ends] - angles[:, starts])
+    values += np.exp(-wrap).sum(axis=1)
+
+    return values[0] if single else values
+
+
+def crossing_angle(pos, edges, pairs=None):
+    batch, single = _batch(pos)
+
+    # crossings differ between drawings, so each one is found separately
+    # and their angles are evaluated at once, the crossing pairs of a
+    # single drawing can be passed in when they are known already
+    values = np.empty(len(batch))
+    for b, p in enumerate(batch):
+        if single and pairs is not None:
+            i, j = pairs
+        else:
+            i, j = crossing_pairs(p1=p[edges[:, 0]], p2=p[edges[:, 1]])
+        u = p[edges[i, 1]] - p[edges[i, 0]]
+        v = p[edges[j, 1]] - p[edges[j, 0]]
+        cos = np.sum(u * v, axis=1) / (
+            np.linalg.norm(u, axis=1) * np.linalg.norm(v, axis=1)
+        )
+        values[b] = np.sum(cos**2)
+
+    return values[0] if single else values
@@ -0,0 +1,76 @@
+# Third Party Library
+import numpy as np
+
+# First Party Library
+from utils.edge_crossing_finder import is_edge_crossing_array
+from utils.sparse_stress import Z
+
+BATCH_SIZE = 100_000
+MAX_SAMPLES = 10_000_000
+WEIGHTS = ["number", "angle"]
+
+
+def pair_values(pos, edges, i, j, weight):
+    a = pos[edges[i, 0]]
+    b = pos[edges[i, 1]]
+    c = pos[edges[j, 0]]
+    d = pos[edges[j, 1]]
+    crossing = is_edge_crossing_array(a, b, c, d)
+    if weight == "number":
+        return crossing.astype(np.float64)
+
+    # a crossing counts the squared cosine of its angle, as egraph does
+    u = b - a
+    v = d - c
+    cos = np.sum(u * v, axis=1) / (
+        np.linalg.norm(u, axis=1) * np.linalg.norm(v, axis=1)
+    )
+
+    return np.where(crossing, cos**2, 0.0)
+
+
+def estimate(
+    pos,
+    edges,
+    weight,
+    relative_error,
+    rng,
+    batch_size=BATCH_SIZE,
+    max_samples=MAX_SAMPLES,
+):
+    if weight not in WEIGHTS:
+        raise ValueError(f"unknown crossing weight: {weight}")
+
+    m = len(edges)
+    n_pairs = m * (m - 1) // 2
+    if n_pairs <= batch_size:
+        i, j = np.triu_indices(m, k=1)
+        return pair_values(pos, edges, i, j, weight).sum(), 0.0
+
+    # edge pairs are drawn uniformly with replacement until the confidence
+    # interval is narrow enough relative to the estimate
+    total = 0.0
+    total_sq = 0.0
+    n_samples = 0
+    while n_samples < max_samples:
+        i = rng.integers(m, size=batch_size)
+        j = rng.integers(m - 1, size=batch_size)
+        j += j >= i
+        values = pair_values(pos, edges, i, j, weight)
+        total += values.sum()
+        total_sq += (values**2).sum()
+        n_samples += batch_size
+
+        mean = total / n_samples
+        variance = max(total_sq / n_samples - mean**2, 0) * (
+            n_samples / (n_samples - 1)
+        )
+        half_width = Z * n_pairs * np.sqrt(variance / n_samples)
+        if mean > 0 and half_width <= relative_error * n_pairs * mean:
+            break
+
+    if total == 0:
+        # no crossing seen, so bound the rate by the rule of three
+        return 0.0, 3 / n_samples * n_pairs
+
+    return n_pairs * mean, half_width
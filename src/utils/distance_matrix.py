@@ -0,0 +1,61 @@
+# Standard Library
+import hashlib
+import os
+
+# Third Party Library
+import numpy as np
+from egraph import all_sources_bfs
+from scipy.sparse.csgraph import shortest_path
+
+# First Party Library
+from config import paths
+from utils import graph_bundle
+
+CACHE_NAME = "distance_matrix"
+CHUNK_SIZE = 256
+
+
+def graph_key(bundle, edge_weight):
+    graph_hash = hashlib.sha256()
+    for name in ["node_ids", "sources", "targets"]:
+        graph_hash.update(np.ascontiguousarray(bundle[name]).tobytes())
+    graph_hash.update(str(edge_weight).encode())
+
+    return graph_hash.hexdigest()
+
+
+def egraph_distance_matrix(eg_graph, edge_weight):
+    # every edge has the same length, so bfs gives the same result as
+    # warshall_floyd in O(nm) instead of O(n^3)
+    return all_sources_bfs(eg_graph, edge_weight)
+
+
+def _write_distance_matrix(bundle, edge_weight, path):
+    n = len(bundle["node_ids"])
+    adjacency = graph_bundle.adjacency_matrix(bundle=bundle)
+
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    distance_matrix = np.lib.format.open_memmap(
+        tmp_path, mode="w+", dtype=np.float32, shape=(n, n)
+    )
+    for start in range(0, n, CHUNK_SIZE):
+        indices = np.arange(start, min(start + CHUNK_SIZE, n))
+        distance_matrix[indices] = edge_weight * shortest_path(
+            adjacency, method="D", unweighted=True, indices=indices
+        )
+    distance_matrix.flush()
+    del distance_matrix
+
+    os.replace(tmp_path, path)
+
+
+def load_distance_matrix(bundle, edge_weight):
+    key = graph_key(bundle=bundle, edge_weight=edge_weight)
+    path = paths.get_cache_path(cache_name=CACHE_NAME, filename=f"{key}.npy")
+    if not path.exists():
+        _write_distance_matrix(
+            bundle=bundle, edge_weight=edge_weight, path=path
+        )
+
+    # rows follow bundle["node_ids"], i.e. the egraph node indices
+    return np.load(path, mmap_mode="r")
@@ -0,0 +1,30 @@
+# Third Party Library
+import numpy as np
+
+# a drawing is an (n, 2) array whose rows follow the egraph node indices,
+# i.e. the order of bundle["node_ids"]
+
+
+def from_egraph(eg_drawing, n, dtype=np.float64):
+    pos = np.empty((n, 2), dtype=dtype)
+    for i in range(n):
+        pos[i, 0] = eg_drawing.x(i)
+        pos[i, 1] = eg_drawing.y(i)
+
+    return pos
+
+
+def to_egraph(pos, eg_drawing):
+    for i, (x, y) in enumerate(np.asarray(pos, dtype=np.float64).tolist()):
+        eg_drawing.set_x(i, x)
+        eg_drawing.set_y(i, y)
+
+
+def from_dict(pos_dict, node_ids, dtype=np.float64):
+    return np.array([pos_dict[u] for u in node_ids], dtype=dtype).reshape(
+        -1, 2
+    )
+
+
+def to_dict(pos, node_ids):
+    return {u: (x, y) for u, (x, y) in zip(node_ids, np.asarray(pos).tolist())}
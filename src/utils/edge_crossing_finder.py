@@ -1,6 +1,9 @@
 # Standard Library
 from itertools import combinations
 
+# Third Party Library
+import numpy as np
+
 
 def is_edge_crossing(p1, p2, p3, p4):
     tc1 = (p1[0] - p2[0]) * (p3[1] - p1[1]) + (p1[1] - p2[1]) * (p1[0] - p3[0])
@@ -10,6 +13,22 @@ def is_edge_crossing(p1, p2, p3, p4):
     return tc1 * tc2 < 0 and td1 * td2 < 0
 
 
+def is_edge_crossing_array(a, b, c, d):
+    tc1 = (a[:, 0] - b[:, 0]) * (c[:, 1] - a[:, 1]) + (a[:, 1] - b[:, 1]) * (
+        a[:, 0] - c[:, 0]
+    )
+    tc2 = (a[:, 0] - b[:, 0]) * (d[:, 1] - a[:, 1]) + (a[:, 1] - b[:, 1]) * (
+        a[:, 0] - d[:, 0]
+    )
+    td1 = (c[:, 0] - d[:, 0]) * (a[:, 1] - c[:, 1]) + (c[:, 1] - d[:, 1]) * (
+        c[:, 0] - a[:, 0]
+    )
+    td2 = (c[:, 0] - d[:, 0]) * (b[:, 1] - c[:, 1]) + (c[:, 1] - d[:, 1]) * (
+        c[:, 0] - b[:, 0]
+    )
+    return (tc1 * tc2 < 0) & (td1 * td2 < 0)
+
+
 def edge_crossing_finder_naive(nx_graph, pos):
     edges = {}
     for s1, t1, attr1 in nx_graph.edges(data=True):
@@ -31,3 +50,87 @@ def edge_crossing_finder(nx_graph, pos):
         if is_edge_crossing(pos[s1], pos[t1], pos[s2], pos[t2])
     }
     return edges
+
+
+def _edge_arrays(edges, pos):
+    p1 = np.array([pos[s] for s, _ in edges], dtype=np.float64).reshape(-1, 2)
+    p2 = np.array([pos[t] for _, t in edges], dtype=np.float64).reshape(-1, 2)
+
+    return p1, p2
+
+
+def _grid_candidates(lower, upper):
+    m = lower.shape[0]
+    extents = (upper - lower).max(axis=1)
+    cell_size = extents.mean()
+    if not cell_size > 0:
+        cell_size = 1.0
+
+    origin = lower.min(axis=0)
+    cell_lower = np.floor((lower - origin) / cell_size).astype(np.int64)
+    cell_upper = np.floor((upper - origin) / cell_size).astype(np.int64)
+    n_rows = cell_upper[:, 1].max() + 1
+
+    # one entry per (edge, cell) covered by the bounding box of the edge
+    spans = cell_upper - cell_lower + 1
+    n_cells = spans[:, 0] * spans[:, 1]
+    edge_ids = np.repeat(np.arange(m), n_cells)
+    local = np.arange(n_cells.sum()) - np.repeat(
+        np.cumsum(n_cells) - n_cells, n_cells
+    )
+    cx = cell_lower[edge_ids, 0] + local // spans[edge_ids, 1]
+    cy = cell_lower[edge_ids, 1] + local % spans[edge_ids, 1]
+    cell_ids = cx * n_rows + cy
+
+    order = np.lexsort((edge_ids, cell_ids))
+    edge_ids = edge_ids[order]
+    cell_ids = cell_ids[order]
+
+    # pair every entry with the entries after it in the same cell
+    _, group_starts, group_sizes = np.unique(
+        cell_ids, return_index=True, return_counts=True
+    )
+    group_ends = np.repeat(group_starts + group_sizes, group_sizes)
+    n_pairs = group_ends - np.arange(len(edge_ids)) - 1
+    first = np.repeat(np.arange(len(edge_ids)), n_pairs)
+    second = (
+        first
+        + 1
+        + np.arange(n_pairs.sum())
+        - np.repeat(np.cumsum(n_pairs) - n_pairs, n_pairs)
+    )
+
+    keys = np.unique(edge_ids[first] * m + edge_ids[second])
+
+    return keys // m, keys % m
+
+
+def crossing_pairs(p1, p2):
+    if len(p1) < 2:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+    lower = np.minimum(p1, p2)
+    upper = np.maximum(p1, p2)
+
+    i, j = _grid_candidates(lower, upper)
+    overlap = np.all((lower[i] <= upper[j]) & (lower[j] <= upper[i]), axis=1)
+    i = i[overlap]
+    j = j[overlap]
+
+    crossing = is_edge_crossing_array(p1[i], p2[i], p1[j], p2[j])
+
+    return i[crossing], j[crossing]
+
+
+def edge_crossing_finder_grid(nx_graph, pos):
+    edges = list(nx_graph.edges())
+    p1, p2 = _edge_arrays(edges, pos)
+    i, j = crossing_pairs(p1=p1, p2=p2)
+
+    return {(edges[u], edges[v]) for u, v in zip(i, j)}
+
+
+EDGE_CROSSING_FINDERS = {
+    "combinations": edge_crossing_finder,
+    "grid": edge_crossing_finder_grid,
+}
@@ -0,0 +1,103 @@
+# Standard Library
+import hashlib
+import json
+
+# First Party Library
+from config import paths
+from utils import segment_store
+
+CACHE_NAME = "evaluations"
+P_NAMES = ["edge_length", "number_of_pivots", "number_of_iterations", "eps"]
+
+
+def get_store_path(
+    dataset_name,
+    sgd_backend="egraph",
+    stress_pivots=None,
+    crossing_relative_error=None,
+    metric_backend="egraph",
+    schedule="exponential",
+    pivot_cache=False,
+):
+    # settings that change the qualities of a drawing get a store of their
+    # own, so only matching evaluations are shared, settings added later
+    # join the config only when not at their default so that the stores
+    # written before them keep their keys
+    config = {
+        "sgd_backend": sgd_backend,
+        "stress_pivots": stress_pivots,
+        "crossing_relative_error": crossing_relative_error,
+        "metric_backend": metric_backend,
+    }
+    if schedule != "exponential":
+        config["schedule"] = schedule
+    if pivot_cache:
+        config["pivot_cache"] = True
+    config_key = hashlib.sha256(
+        json.dumps(config, sort_keys=True).encode()
+    ).hexdigest()[:16]
+
+    return paths.get_cache_path(
+        cache_name=CACHE_NAME, filename=f"{dataset_name}-{config_key}"
+    )
+
+
+def evaluation_key(params, seed):
+    return json.dumps([params[p_name] for p_name in P_NAMES] + [seed])
+
+
+def open_store(store_path):
+    return {
+        "store_path": store_path,
+        "n_segments": 0,
+        "qualities": {},
+        "error_bounds": {},
+        # new evaluations are written together by flush
+        "buffer": segment_store.open_buffer(store_path),
+    }
+
+
+def refresh(store):
+    # pick up what other processes have written since the last read
+    entries = segment_store.read_manifest(store["store_path"])
+    if len(entries) < store["n_segments"]:
+        # the store was compacted, read it again from the start
+        store["n_segments"] = 0
+    for entry in entries[store["n_segments"] :]:
+        rows = segment_store.read_segment(
+            store_path=store["store_path"], entry=entry, with_side=False
+        )
+        for row in rows:
+            store["qualities"][row["key"]] = row["qualities"]
+            store["error_bounds"][row["key"]] = row.get("error_bounds", {})
+    store["n_segments"] = len(entries)
+
+
+def lookup(store, params, seed):
+    return store["qualities"].get(evaluation_key(params=params, seed=seed))
+
+
+def lookup_error_bounds(store, params, seed):
+    return store["error_bounds"].get(
+        evaluation_key(params=params, seed=seed), {}
+    )
+
+
+def add(store, params, seed, qualities, error_bounds=None):
+    # error bounds of approximated metrics travel with their qualities
+    if error_bounds is None:
+        error_bounds = {}
+    key = evaluation_key(params=params, seed=seed)
+    store["qualities"][key] = qualities
+    store["error_bounds"][key] = error_bounds
+    segment_store.buffered_append(
+        buffer=store["buffer"],
+        rows=[
+            {"key": key, "qualities": qualities, "error_bounds": error_bounds}
+        ],
+    )
+
+
+def flush(store):
+    # makes the evaluations added so far visible to other processes
+    segment_store.flush(store["buffer"])
@@ -0,0 +1,100 @@
+# Standard Library
+import os
+
+# Third Party Library
+import networkx as nx
+import numpy as np
+from scipy.sparse import csr_array
+
+# First Party Library
+from config import paths
+from utils import graph
+
+CACHE_NAME = "graph_bundle"
+
+
+def from_nx_graph(nx_graph, edge_weight):
+    node_ids = [str(u) for u in nx_graph.nodes]
+    node_indices = {u: i for i, u in enumerate(node_ids)}
+    n = len(node_ids)
+
+    # keep the nx edge order so egraph edge indices stay the same
+    edges = list(nx_graph.edges(data="id"))
+    sources = np.array(
+        [node_indices[str(u)] for u, _, _ in edges], dtype=np.int32
+    )
+    targets = np.array(
+        [node_indices[str(v)] for _, v, _ in edges], dtype=np.int32
+    )
+    edge_ids = np.array([str(i) for _, _, i in edges], dtype=np.str_)
+
+    rows = np.concatenate([sources, targets])
+    cols = np.concatenate([targets, sources])
+    order = np.lexsort((cols, rows))
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+
+    return {
+        "node_ids": np.array(node_ids, dtype=np.str_),
+        "edge_ids": edge_ids,
+        "sources": sources,
+        "targets": targets,
+        "indptr": indptr,
+        "indices": cols[order].astype(np.int32),
+        "edge_weight": np.array(edge_weight, dtype=np.float64),
+    }
+
+
+def to_nx_graph(bundle):
+    node_ids = bundle["node_ids"].tolist()
+    edge_weight = bundle["edge_weight"].item()
+
+    nx_graph = nx.Graph()
+    nx_graph.add_nodes_from(node_ids)
+    for s, t, i in zip(
+        bundle["sources"].tolist(),
+        bundle["targets"].tolist(),
+        bundle["edge_ids"].tolist(),
+    ):
+        nx_graph.add_edge(node_ids[s], node_ids[t], weight=edge_weight, id=i)
+
+    return nx_graph
+
+
+def adjacency_matrix(bundle):
+    n = len(bundle["node_ids"])
+    indices = bundle["indices"]
+
+    return csr_array(
+        (np.ones(len(indices), dtype=np.float64), indices, bundle["indptr"]),
+        shape=(n, n),
+    )
+
+
+def save(bundle, path):
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with tmp_path.open(mode="wb") as f:
+        np.savez(f, **bundle)
+    os.replace(tmp_path, path)
+
+
+def load(dataset_name, edge_weight):
+    path = paths.get_cache_path(
+        cache_name=CACHE_NAME, filename=f"{dataset_name}-{edge_weight}.npz"
+    )
+    if not path.exists():
+        nx_graph = graph.load_nx_graph(
+            dataset_path=paths.get_dataset_path(dataset_name=dataset_name)
+        )
+        nx_graph = graph.graph_preprocessing(
+            nx_graph=nx_graph, edge_weight=edge_weight
+        )
+        save(
+            bundle=from_nx_graph(nx_graph=nx_graph, edge_weight=edge_weight),
+            path=path,
+        )
+
+    with np.load(path) as npz:
+        bundle = {name: npz[name] for name in npz.files}
+
+    return bundle
@@ -1,12 +1,10 @@
-def gravity_center(pos):
-    gx = 0
-    gy = 0
-    for node_id in pos:
-        x, y = pos[node_id]
-        gx += x
-        gy += y
+# Third Party Library
+import numpy as np
+
 
-    gx /= len(pos)
-    gy /= len(pos)
+def gravity_center(pos):
+    if isinstance(pos, dict):
+        pos = list(pos.values())
+    gx, gy = np.asarray(pos, dtype=np.float64).mean(axis=0)
 
     return gx, gy
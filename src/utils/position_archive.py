@@ -0,0 +1,196 @@
+# Standard Library
+import json
+from pathlib import Path
+
+# Third Party Library
+import numpy as np
+
+# First Party Library
+from utils.segment_store import lock
+
+ARCHIVE_DIRNAME = "positions"
+META_FILENAME = "meta.json"
+INDEX_FILENAME = "index.jsonl"
+BLOCKS_FILENAME = "blocks.bin"
+BOUNDS_FILENAME = "bounds.bin"
+CODECS = {"float32": np.float32, "uint16": np.uint16}
+
+_writers = {}
+
+
+def get_archive_path(store_path):
+    return Path(store_path).joinpath(ARCHIVE_DIRNAME)
+
+
+def _encode(pos, codec):
+    pos = np.asarray(pos, dtype=np.float64)
+    if codec == "float32":
+        return pos.astype(np.float32), None
+
+    # each run is scaled onto the full uint16 range of its bounding box
+    lower = pos.min(axis=0)
+    scale = (pos.max(axis=0) - lower) / np.iinfo(np.uint16).max
+    scale[scale == 0] = 1.0
+    block = np.rint((pos - lower) / scale).astype(np.uint16)
+
+    return block, np.stack([lower, scale])
+
+
+def _row_bytes(meta):
+    return meta["n"] * 2 * np.dtype(CODECS[meta["codec"]]).itemsize
+
+
+def _read_index(archive_path):
+    index_path = archive_path.joinpath(INDEX_FILENAME)
+    if not index_path.exists():
+        return [], 0
+
+    with index_path.open(mode="rb") as f:
+        lines = f.read().splitlines(keepends=True)
+    # a line without its newline is an index write cut short
+    lines = [line for line in lines if line.endswith(b"\n")]
+
+    return [json.loads(line)["id"] for line in lines], sum(map(len, lines))
+
+
+def _truncate(path, size):
+    if path.exists() and path.stat().st_size > size:
+        with path.open(mode="r+b") as f:
+            f.truncate(size)
+
+
+def _size(path):
+    return path.stat().st_size if path.exists() else 0
+
+
+def _sizes(writer):
+    # what the files of the archive hold once the runs of the writer are in
+    archive_path = writer["archive_path"]
+    runs = writer["runs"]
+    row_bytes = 0 if writer["meta"] is None else _row_bytes(writer["meta"])
+    bounds_bytes = 0
+    if writer["meta"] is not None and writer["meta"]["codec"] != "float32":
+        bounds_bytes = 2 * 2 * np.dtype(np.float64).itemsize
+
+    return {
+        archive_path.joinpath(INDEX_FILENAME): writer["index_size"],
+        archive_path.joinpath(BLOCKS_FILENAME): runs * row_bytes,
+        archive_path.joinpath(BOUNDS_FILENAME): runs * bounds_bytes,
+    }
+
+
+def _repair(writer):
+    archive_path = writer["archive_path"]
+    meta_path = archive_path.joinpath(META_FILENAME)
+    if meta_path.exists():
+        with meta_path.open(mode="r") as f:
+            writer["meta"] = json.load(f)
+    ids, writer["index_size"] = _read_index(archive_path)
+    writer["runs"] = len(ids)
+
+    # rows a crashed append wrote without its index line are dropped, so
+    # block row k always belongs to index line k
+    for path, size in _sizes(writer).items():
+        _truncate(path, size)
+
+
+def open_writer(archive_path, codec="float32"):
+    archive_path = Path(archive_path)
+    if codec not in CODECS:
+        raise ValueError(f"unknown position codec: {codec}")
+
+    writer = {
+        "archive_path": archive_path,
+        "codec": codec,
+        "meta": None,
+        "runs": 0,
+        "index_size": 0,
+    }
+    with lock(archive_path):
+        _repair(writer)
+
+    return writer
+
+
+def write(writer, run_id, pos):
+    archive_path = writer["archive_path"]
+    with lock(archive_path):
+        # the index is read again only if another process appended or cut
+        # an append short since this writer last wrote
+        if any(_size(path) != size for path, size in _sizes(writer).items()):
+            _repair(writer)
+
+        if writer["meta"] is None:
+            writer["meta"] = {"n": len(pos), "codec": writer["codec"]}
+            with archive_path.joinpath(META_FILENAME).open(mode="w") as f:
+                json.dump(writer["meta"], f)
+        meta = writer["meta"]
+        if meta["n"] != len(pos):
+            raise ValueError(f"expected {meta['n']} nodes, got {len(pos)}")
+
+        block, bounds = _encode(pos=pos, codec=meta["codec"])
+        with archive_path.joinpath(BLOCKS_FILENAME).open(mode="ab") as f:
+            f.write(block.tobytes())
+        if bounds is not None:
+            with archive_path.joinpath(BOUNDS_FILENAME).open(mode="ab") as f:
+                f.write(bounds.tobytes())
+        # a run is readable once its index line exists
+        line = f"{json.dumps({'id': run_id, 'row': writer['runs']})}\n"
+        with archive_path.joinpath(INDEX_FILENAME).open(mode="ab") as f:
+            f.write(line.encode())
+        writer["runs"] += 1
+        writer["index_size"] += len(line.encode())
+
+
+def append(archive_path, run_id, pos, codec="float32"):
+    # one writer per archive and process
+    archive_path = Path(archive_path)
+    if archive_path not in _writers:
+        _writers[archive_path] = open_writer(
+            archive_path=archive_path, codec=codec
+        )
+
+    write(writer=_writers[archive_path], run_id=run_id, pos=pos)
+
+
+def load(archive_path):
+    archive_path = Path(archive_path)
+    with archive_path.joinpath(META_FILENAME).open(mode="r") as f:
+        meta = json.load(f)
+    ids, _ = _read_index(archive_path)
+
+    # rows past the last index line belong to an unfinished append and are
+    # left out of the map
+    runs = len(ids)
+    blocks = np.memmap(
+        archive_path.joinpath(BLOCKS_FILENAME),
+        dtype=CODECS[meta["codec"]],
+        mode="r",
+        shape=(runs, meta["n"], 2),
+    )
+    bounds = None
+    if meta["codec"] != "float32":
+        bounds = np.memmap(
+            archive_path.joinpath(BOUNDS_FILENAME),
+            dtype=np.float64,
+            mode="r",
+            shape=(runs, 2, 2),
+        )
+
+    return {
+        "ids": ids,
+        "rows": {run_id: row for row, run_id in enumerate(ids)},
+        "blocks": blocks,
+        "bounds": bounds,
+    }
+
+
+def read(archive, run_id):
+    row = archive["rows"][run_id]
+    block = archive["blocks"][row]
+    if archive["bounds"] is None:
+        return np.asarray(block)
+
+    lower, scale = archive["bounds"][row]
+
+    return block * scale + lower
@@ -1,83 +1,264 @@
+# Standard Library
+import time
+
 # Third Party Library
-from egraph import crossing_edges, warshall_floyd
+from egraph import crossing_edges
+from scipy.sparse.csgraph import shortest_path
+from scipy.spatial import cKDTree
 
 # First Party Library
 from config import const
-from quality_metrics import (
-    angular_resolution,
-    aspect_ratio,
-    crossing_angle,
-    crossing_number,
-    gabriel_graph_property,
-    ideal_edge_lengths,
-    neighborhood_preservation,
-    node_resolution,
-    stress,
-)
+from config.quality_metrics import QUALITY_METRICS_MAP
+from generators import graph as graph_generator
+from layouts import numpy_sgd
+from utils import distance_matrix, drawing, tracing
+from utils.edge_crossing_finder import crossing_pairs
 
 
-def measure_qualities(
+def _eg_crossings(eg_graph, eg_drawing):
+    return crossing_edges(eg_graph, eg_drawing)
+
+
+def _eg_distance_matrix(eg_graph):
+    return distance_matrix.egraph_distance_matrix(
+        eg_graph=eg_graph, edge_weight=const.EDGE_WEIGHT
+    )
+
+
+def _distance_matrix(adjacency):
+    return const.EDGE_WEIGHT * shortest_path(
+        adjacency, method="D", unweighted=True
+    )
+
+
+def _edges(eg_graph):
+    return graph_generator.egraph_edges(eg_graph=eg_graph)
+
+
+def _pos(eg_graph, eg_drawing):
+    return drawing.from_egraph(eg_drawing=eg_drawing, n=eg_graph.node_count())
+
+
+def _kd_tree(pos):
+    return cKDTree(pos)
+
+
+def _crossing_pairs(pos, edges):
+    return crossing_pairs(p1=pos[edges[:, 0]], p2=pos[edges[:, 1]])
+
+
+def _adjacency(eg_graph, edges):
+    return numpy_sgd.adjacency_matrix(
+        n=eg_graph.node_count(), sources=edges[:, 0], targets=edges[:, 1]
+    )
+
+
+# intermediate name -> (names it is computed from, function)
+INTERMEDIATES = {
+    "adjacency": (["eg_graph", "edges"], _adjacency),
+    "crossing_pairs": (["pos", "edges"], _crossing_pairs),
+    "distance_matrix": (["adjacency"], _distance_matrix),
+    "edges": (["eg_graph"], _edges),
+    "eg_crossings": (["eg_graph", "eg_drawing"], _eg_crossings),
+    "eg_distance_matrix": (["eg_graph"], _eg_distance_matrix),
+    "kd_tree": (["pos"], _kd_tree),
+    "pos": (["eg_graph", "eg_drawing"], _pos),
+}
+
+
+METRIC_BACKENDS = ["egraph", "numpy"]
+
+# metrics with a numpy_quality, see utils/angular_metrics,
+# utils/spatial_metrics and utils/sparse_stress
+NUMPY_QM_NAMES = [
+    "angular_resolution",
+    "crossing_angle",
+    "crossing_number",
+    "gabriel_graph_property",
+    "ideal_edge_lengths",
+    "neighborhood_preservation",
+    "node_resolution",
+    "stress",
+]
+
+
+def build_approximations(
+    seed, stress_pivots=None, crossing_relative_error=None
+):
+    approximations = {}
+
+    # stress from k pivot rows and ideal edge lengths from the edges alone,
+    # so that no n x n distance matrix is needed
+    if stress_pivots is not None:
+        approximations["ideal_edge_lengths"] = {}
+        approximations["stress"] = {
+            "number_of_pivots": stress_pivots,
+            "seed": seed,
+        }
+
+    # crossings from sampled edge pairs instead of enumerating all of them
+    if crossing_relative_error is not None:
+        for qm_name in ["crossing_angle", "crossing_number"]:
+            approximations[qm_name] = {
+                "relative_error": crossing_relative_error,
+                "seed": seed,
+            }
+
+    return approximations
+
+
+def build_backends(metric_backend="egraph"):
+    return {qm_name: metric_backend for qm_name in NUMPY_QM_NAMES}
+
+
+def _resolve(name, context, timings):
+    if context.get(name) is not None:
+        return context[name]
+
+    requires, compute = INTERMEDIATES[name]
+    args = {
+        required: _resolve(name=required, context=context, timings=timings)
+        for required in requires
+    }
+
+    start = time.perf_counter()
+    with tracing.span(name):
+        context[name] = compute(**args)
+    timings["intermediates"][name] = time.perf_counter() - start
+
+    return context[name]
+
+
+def _requires(qm, approximation, backend):
+    if approximation is not None:
+        return qm.approximate_requires
+    if backend == "numpy":
+        return qm.numpy_requires
+
+    return qm.requires
+
+
+def _measure(qm, args, approximation, backend):
+    if approximation is not None:
+        return qm.approximate_quality(**args, **approximation)
+    if backend == "numpy":
+        return qm.numpy_quality(**args), None
+
+    return qm.quality(**args), None
+
+
+def measure_qualities_with_timings(
     target_qm_names,
     eg_graph,
     eg_drawing,
-    eg_crossings=None,
-    eg_distance_matrix=None,
+    approximations=None,
+    backends=None,
+    **intermediates,
 ):
-    if eg_distance_matrix is None and (
-        "ideal_edge_lengths" in target_qm_names or "stress" in target_qm_names
-    ):
-        eg_distance_matrix = warshall_floyd(
-            eg_graph, lambda _: const.EDGE_WEIGHT
-        )
-    if eg_crossings is None and (
-        "crossing_angle" in target_qm_names
-        or "crossing_number" in target_qm_names
-    ):
-        eg_crossings = crossing_edges(eg_graph, eg_drawing)
+    # approximations maps a qm name to the keyword arguments of its
+    # approximate_quality, e.g. {"stress": {"number_of_pivots": 100}}
+    if approximations is None:
+        approximations = {}
+    if backends is None:
+        backends = {}
+
+    context = {"eg_graph": eg_graph, "eg_drawing": eg_drawing, **intermediates}
+    timings = {
+        "intermediates": {},
+        "qualities": {},
+        "error_bounds": {},
+        "confidence_intervals": {},
+    }
 
     qualities = {}
-    for qm_name in target_qm_names:
-        if qm_name == "angular_resolution":
-            qualities[qm_name] = angular_resolution.quality(
-                eg_graph=eg_graph, eg_drawing=eg_drawing
-            )
-        elif qm_name == "aspect_ratio":
-            qualities[qm_name] = aspect_ratio.quality(eg_drawing=eg_drawing)
-        elif qm_name == "crossing_angle":
-            qualities[qm_name] = crossing_angle.quality(
-                eg_graph=eg_graph,
-                eg_drawing=eg_drawing,
-                eg_crossings=eg_crossings,
-            )
-        elif qm_name == "crossing_number":
-            qualities[qm_name] = crossing_number.quality(
-                eg_graph=eg_graph,
-                eg_drawing=eg_drawing,
-                eg_crossings=eg_crossings,
-            )
-        elif qm_name == "gabriel_graph_property":
-            qualities[qm_name] = gabriel_graph_property.quality(
-                eg_graph=eg_graph, eg_drawing=eg_drawing
-            )
-        elif qm_name == "ideal_edge_lengths":
-            qualities[qm_name] = ideal_edge_lengths.quality(
-                eg_graph=eg_graph,
-                eg_drawing=eg_drawing,
-                eg_distance_matrix=eg_distance_matrix,
-            )
-        elif qm_name == "node_resolution":
-            qualities[qm_name] = node_resolution.quality(
-                eg_graph=eg_graph, eg_drawing=eg_drawing
-            )
-        elif qm_name == "neighborhood_preservation":
-            qualities[qm_name] = neighborhood_preservation.quality(
-                eg_graph=eg_graph, eg_drawing=eg_drawing
+    with tracing.span("qualities"):
+        for qm_name in target_qm_names:
+            qm = QUALITY_METRICS_MAP[qm_name]
+            approximation = approximations.get(qm_name)
+            backend = backends.get(qm_name, "egraph")
+            args = {
+                required: _resolve(
+                    name=required, context=context, timings=timings
+                )
+                for required in _requires(
+                    qm=qm, approximation=approximation, backend=backend
+                )
+            }
+
+            start = time.perf_counter()
+            with tracing.span(qm_name):
+                qualities[qm_name], error_bound = _measure(
+                    qm=qm,
+                    args=args,
+                    approximation=approximation,
+                    backend=backend,
+                )
+            timings["qualities"][qm_name] = time.perf_counter() - start
+            if error_bound is not None:
+                timings["error_bounds"][qm_name] = error_bound
+                timings["confidence_intervals"][qm_name] = confidence_interval(
+                    quality=qualities[qm_name], error_bound=error_bound
+                )
+
+    return qualities, timings
+
+
+def mean_timings(timings_list):
+    # wall times of several drawings, averaged per intermediate and metric
+    summary = {}
+    for kind in ["intermediates", "qualities"]:
+        names = {name for timings in timings_list for name in timings[kind]}
+        summary[kind] = {
+            name: sum(
+                timings[kind][name]
+                for timings in timings_list
+                if name in timings[kind]
             )
-        elif qm_name == "stress":
-            qualities[qm_name] = stress.quality(
-                eg_graph=eg_graph,
-                eg_drawing=eg_drawing,
-                eg_distance_matrix=eg_distance_matrix,
+            / sum(1 for timings in timings_list if name in timings[kind])
+            for name in sorted(names)
+        }
+
+    return summary
+
+
+def confidence_interval(quality, error_bound):
+    # every approximated quality is a negated sum of non-negative terms, so
+    # the interval is capped at 0, and a crossing estimate that saw no
+    # crossing gets the one-sided rule of three interval
+    return [quality - error_bound, min(quality + error_bound, 0.0)]
+
+
+def max_error_bounds(timings_list):
+    # the largest bound of the seeds also bounds their mean and median
+    error_bounds = {}
+    for timings in timings_list:
+        for qm_name, error_bound in timings["error_bounds"].items():
+            error_bounds[qm_name] = max(
+                error_bounds.get(qm_name, 0.0), error_bound
             )
 
+    return error_bounds
+
+
+def measure_qualities(
+    target_qm_names,
+    eg_graph,
+    eg_drawing,
+    eg_crossings=None,
+    eg_distance_matrix=None,
+    approximations=None,
+    backends=None,
+    **intermediates,
+):
+    qualities, _ = measure_qualities_with_timings(
+        target_qm_names=target_qm_names,
+        eg_graph=eg_graph,
+        eg_drawing=eg_drawing,
+        approximations=approximations,
+        backends=backends,
+        eg_crossings=eg_crossings,
+        eg_distance_matrix=eg_distance_matrix,
+        **intermediates,
+    )
+
     return qualities
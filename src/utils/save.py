@@ -1,76 +1,111 @@
-# Third Party Library
-import pandas as pd
-
 # First Party Library
-from utils import uuid
+from utils import position_archive, segment_store, uuid
+
+
+def _append(store_path, row, pos, pos_codec, buffer=None):
+    # without a codec the drawing stays in the side files of the store
+    if pos_codec is None:
+        row["pos"] = pos
+    else:
+        position_archive.append(
+            archive_path=position_archive.get_archive_path(store_path),
+            run_id=row["id"],
+            pos=pos,
+            codec=pos_codec,
+        )
 
+    if buffer is None:
+        segment_store.append(store_path=store_path, rows=[row])
+    else:
+        segment_store.buffered_append(buffer=buffer, rows=[row])
 
-def e_nfs(seed, params, qualities, pos, e_nfs_path):
+
+def e_nfs(
+    seed, params, qualities, pos, e_nfs_path, pos_codec=None, buffer=None
+):
     data_id = uuid.get_uuid()
-    base_df = pd.DataFrame()
-    if e_nfs_path.exists():
-        base_df = pd.read_pickle(e_nfs_path)
 
-    new_df = pd.DataFrame(
-        [
-            {
-                "id": data_id,
-                "seed": seed,
-                "params": params,
-                "qualities": qualities,
-                "pos": pos,
-            }
-        ]
+    _append(
+        store_path=e_nfs_path,
+        row={
+            "id": data_id,
+            "seed": seed,
+            "params": params,
+            "qualities": qualities,
+        },
+        pos=pos,
+        pos_codec=pos_codec,
+        buffer=buffer,
     )
 
-    df = pd.concat([base_df, new_df])
-    df.to_pickle(e_nfs_path)
-
 
-def r_nfs(params_id, seed, params, qualities, pos, r_nfs_path):
+def r_nfs(
+    params_id,
+    seed,
+    params,
+    qualities,
+    pos,
+    r_nfs_path,
+    pos_codec=None,
+    buffer=None,
+):
     data_id = uuid.get_uuid()
-    base_df = pd.DataFrame()
-    if r_nfs_path.exists():
-        base_df = pd.read_pickle(r_nfs_path)
 
-    new_df = pd.DataFrame(
-        [
-            {
-                "id": data_id,
-                "params_id": params_id,
-                "seed": seed,
-                "params": params,
-                "qualities": qualities,
-                "pos": pos,
-            }
-        ]
+    _append(
+        store_path=r_nfs_path,
+        row={
+            "id": data_id,
+            "params_id": params_id,
+            "seed": seed,
+            "params": params,
+            "qualities": qualities,
+        },
+        pos=pos,
+        pos_codec=pos_codec,
+        buffer=buffer,
     )
 
-    df = pd.concat([base_df, new_df])
-    df.to_pickle(r_nfs_path)
-
 
 def o_nfs(
-    params_id, target_qm_names, seed, params, qualities, pos, o_nfs_path
+    params_id,
+    target_qm_names,
+    seed,
+    params,
+    qualities,
+    pos,
+    o_nfs_path,
+    pos_codec=None,
+    buffer=None,
 ):
     data_id = uuid.get_uuid()
-    base_df = pd.DataFrame()
-    if o_nfs_path.exists():
-        base_df = pd.read_pickle(o_nfs_path)
 
-    new_df = pd.DataFrame(
-        [
-            {
-                "id": data_id,
-                "params_id": params_id,
-                "target_qm_names": target_qm_names,
-                "seed": seed,
-                "params": params,
-                "qualities": qualities,
-                "pos": pos,
-            }
-        ]
+    _append(
+        store_path=o_nfs_path,
+        row={
+            "id": data_id,
+            "params_id": params_id,
+            "target_qm_names": target_qm_names,
+            "seed": seed,
+            "params": params,
+            "qualities": qualities,
+        },
+        pos=pos,
+        pos_codec=pos_codec,
+        buffer=buffer,
     )
 
-    df = pd.concat([base_df, new_df])
-    df.to_pickle(o_nfs_path)
+
+def grid(params_id, seed, params, qualities, grid_path, buffer=None):
+    data_id = uuid.get_uuid()
+
+    row = {
+        "id": data_id,
+        "params_id": params_id,
+        "seed": seed,
+        "params": params,
+        "qualities": qualities,
+    }
+    if buffer is None:
+        segment_store.append(store_path=grid_path, rows=[row])
+    else:
+        segment_store.buffered_append(buffer=buffer, rows=[row])
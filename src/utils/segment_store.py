@@ -0,0 +1,252 @@
+# Standard Library
+import fcntl
+import json
+import os
+import pickle
+from contextlib import contextmanager
+from pathlib import Path
+
+# Third Party Library
+import pandas as pd
+
+# First Party Library
+from utils import tracing, uuid
+
+MANIFEST_FILENAME = "manifest.jsonl"
+LOCK_FILENAME = ".lock"
+SEGMENTS_DIRNAME = "segments"
+SIDE_DIRNAME = "side"
+# heavy columns kept out of the segments, keyed by row id
+SIDE_COLUMNS = ["pos"]
+# rows appended through a buffer are written as one segment per flush
+BUFFER_ROWS = 100
+
+
+@contextmanager
+def lock(store_path):
+    store_path.mkdir(parents=True, exist_ok=True)
+    with store_path.joinpath(LOCK_FILENAME).open(mode="a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _write_pickle(path, obj):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with tmp_path.open(mode="wb") as f:
+        pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+    # a file becomes visible only once it is complete
+    os.replace(tmp_path, path)
+
+
+def _read_pickle(path):
+    with path.open(mode="rb") as f:
+        return pickle.load(f)
+
+
+def _split_rows(rows):
+    side_columns = [
+        column
+        for column in SIDE_COLUMNS
+        if all(["id" in row and column in row for row in rows])
+    ]
+    main_rows = [
+        {key: value for key, value in row.items() if key not in side_columns}
+        for row in rows
+    ]
+    side = {
+        column: {row["id"]: row[column] for row in rows}
+        for column in side_columns
+    }
+
+    return main_rows, side
+
+
+def _write_segment(store_path, rows):
+    main_rows, side = _split_rows(rows)
+
+    segment_name = f"{uuid.get_uuid()}.pkl"
+    # the side file goes first so that a listed segment is always complete
+    if len(side) > 0:
+        _write_pickle(store_path.joinpath(SIDE_DIRNAME, segment_name), side)
+    _write_pickle(
+        store_path.joinpath(SEGMENTS_DIRNAME, segment_name), main_rows
+    )
+
+    entry = {"segment": segment_name, "n_rows": len(rows)}
+    if len(side) > 0:
+        entry["ids"] = [row["id"] for row in rows]
+
+    return entry
+
+
+def append(store_path, rows):
+    store_path = Path(store_path)
+    rows = list(rows)
+    if len(rows) == 0:
+        return
+
+    with tracing.span("save", store=store_path.name, n_rows=len(rows)):
+        entry = json.dumps(_write_segment(store_path=store_path, rows=rows))
+        with lock(store_path):
+            with store_path.joinpath(MANIFEST_FILENAME).open(mode="a") as f:
+                f.write(f"{entry}\n")
+
+
+def open_buffer(store_path, max_rows=BUFFER_ROWS):
+    return {"store_path": Path(store_path), "rows": [], "max_rows": max_rows}
+
+
+def buffered_append(buffer, rows):
+    buffer["rows"].extend(rows)
+    if len(buffer["rows"]) >= buffer["max_rows"]:
+        flush(buffer)
+
+
+def flush(buffer):
+    rows = buffer["rows"]
+    buffer["rows"] = []
+    append(store_path=buffer["store_path"], rows=rows)
+
+
+@contextmanager
+def buffered(store_path, max_rows=BUFFER_ROWS):
+    # what is still buffered is written when the block is left, rows of an
+    # interrupted run since the last flush are lost
+    buffer = open_buffer(store_path=store_path, max_rows=max_rows)
+    try:
+        yield buffer
+    finally:
+        flush(buffer)
+
+
+def read_manifest(store_path):
+    manifest_path = Path(store_path).joinpath(MANIFEST_FILENAME)
+    if not manifest_path.exists():
+        return []
+
+    with manifest_path.open(mode="r") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def read_segment(store_path, entry, with_side=True):
+    store_path = Path(store_path)
+    rows = _read_pickle(
+        store_path.joinpath(SEGMENTS_DIRNAME, entry["segment"])
+    )
+    if with_side and "ids" in entry:
+        side = _read_pickle(
+            store_path.joinpath(SIDE_DIRNAME, entry["segment"])
+        )
+        for row in rows:
+            for column, values in side.items():
+                row[column] = values[row["id"]]
+
+    return rows
+
+
+def iter_segments(store_path, with_side=True):
+    for entry in read_manifest(store_path):
+        yield read_segment(
+            store_path=store_path, entry=entry, with_side=with_side
+        )
+
+
+def iter_rows(store_path, with_side=True):
+    for rows in iter_segments(store_path, with_side=with_side):
+        yield from rows
+
+
+def count_rows(store_path):
+    return sum([entry["n_rows"] for entry in read_manifest(store_path)])
+
+
+def read_df(store_path):
+    store_path = Path(store_path)
+    # results written before the segment store are single pickles
+    if store_path.is_file():
+        return pd.read_pickle(store_path)
+
+    return pd.DataFrame(list(iter_rows(store_path)))
+
+
+def _flatten(df, columns, p_names, qm_names):
+    frames = [df[[column for column in columns if column in df]]]
+    for name, names in [("params", p_names), ("qualities", qm_names)]:
+        if name not in df or names == []:
+            continue
+        flat = pd.DataFrame(df[name].tolist(), index=df.index)
+        frames.append(flat if names is None else flat[names])
+
+    return pd.concat(frames, axis=1).infer_objects()
+
+
+def read_columns(
+    store_path, columns=("id", "seed"), p_names=None, qm_names=None
+):
+    # params and qualities become one typed column per name, all of them
+    # when the names are None and none of them when the names are []
+    store_path = Path(store_path)
+    if store_path.is_file():
+        df = pd.read_pickle(store_path)
+    else:
+        df = pd.DataFrame(list(iter_rows(store_path, with_side=False)))
+
+    return _flatten(df=df, columns=columns, p_names=p_names, qm_names=qm_names)
+
+
+def load_side(store_path, ids, column="pos"):
+    store_path = Path(store_path)
+    ids = set(ids)
+    if store_path.is_file():
+        df = pd.read_pickle(store_path)
+        df = df[df["id"].isin(ids)]
+        return dict(zip(df["id"], df[column]))
+
+    # only the side files of segments holding a requested id are read
+    values = {}
+    for entry in read_manifest(store_path):
+        if "ids" in entry:
+            if ids.isdisjoint(entry["ids"]):
+                continue
+            side = _read_pickle(
+                store_path.joinpath(SIDE_DIRNAME, entry["segment"])
+            )
+            rows = [{"id": i, column: side[column][i]} for i in entry["ids"]]
+        else:
+            rows = _read_pickle(
+                store_path.joinpath(SEGMENTS_DIRNAME, entry["segment"])
+            )
+        for row in rows:
+            if row.get("id") in ids:
+                values[row["id"]] = row[column]
+
+    return values
+
+
+def compact(store_path):
+    store_path = Path(store_path)
+    with lock(store_path):
+        entries = read_manifest(store_path)
+        if len(entries) <= 1:
+            return
+
+        rows = list(iter_rows(store_path))
+        entry = json.dumps(_write_segment(store_path=store_path, rows=rows))
+
+        tmp_path = store_path.joinpath(f".{MANIFEST_FILENAME}.tmp")
+        with tmp_path.open(mode="w") as f:
+            f.write(f"{entry}\n")
+        os.replace(tmp_path, store_path.joinpath(MANIFEST_FILENAME))
+
+        for old_entry in entries:
+            store_path.joinpath(
+                SEGMENTS_DIRNAME, old_entry["segment"]
+            ).unlink()
+            if "ids" in old_entry:
+                store_path.joinpath(
+                    SIDE_DIRNAME, old_entry["segment"]
+                ).unlink()
@@ -0,0 +1,71 @@
+# Standard Library
+import atexit
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+
+# Third Party Library
+import numpy as np
+
+# a handle maps array names to the shared memory block, shape and dtype of
+# each array and is small enough to be passed to every worker
+
+
+def publish(arrays):
+    handle = {}
+    blocks = []
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        block = shared_memory.SharedMemory(
+            create=True, size=max(array.nbytes, 1)
+        )
+        np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[
+            ...
+        ] = array
+        blocks.append(block)
+        handle[name] = {
+            "name": block.name,
+            "shape": array.shape,
+            "dtype": array.dtype.str,
+        }
+
+    # the publishing process owns the blocks, they are removed when it
+    # exits unless they were released before
+    atexit.register(release, blocks=blocks, unlink=True)
+
+    return handle, blocks
+
+
+def attach(handle):
+    arrays = {}
+    blocks = []
+    for name, spec in handle.items():
+        block = shared_memory.SharedMemory(name=spec["name"])
+        array = np.ndarray(
+            spec["shape"], dtype=np.dtype(spec["dtype"]), buffer=block.buf
+        )
+        array.flags.writeable = False
+        arrays[name] = array
+        blocks.append(block)
+
+    # the arrays are views into the blocks, which have to stay open as long
+    # as the arrays are used
+    return arrays, blocks
+
+
+def release(blocks, unlink=False):
+    for block in blocks:
+        block.close()
+        if unlink:
+            try:
+                block.unlink()
+            except FileNotFoundError:
+                pass
+
+
+@contextmanager
+def published(arrays):
+    handle, blocks = publish(arrays)
+    try:
+        yield handle
+    finally:
+        release(blocks=blocks, unlink=True)
@@ -0,0 +1,62 @@
+# Third Party Library
+import numpy as np
+from scipy.sparse.csgraph import shortest_path
+
+# two sided 95% normal quantile
+Z = 1.959963984540054
+CHUNK_SIZE = 256
+
+
+def row_stresses(pos, adjacency, pivots, edge_weight):
+    distances = edge_weight * shortest_path(
+        adjacency, method="D", unweighted=True, indices=pivots
+    )
+    norms = np.linalg.norm(pos[pivots, None, :] - pos[None, :, :], axis=2)
+
+    # the pivot itself and unreachable nodes contribute nothing
+    mask = (distances > 0) & np.isfinite(distances)
+    terms = np.zeros_like(distances)
+    terms[mask] = ((norms[mask] - distances[mask]) / distances[mask]) ** 2
+
+    return terms.sum(axis=1)
+
+
+def full_stress(pos, distance_matrix, chunk_size=CHUNK_SIZE):
+    # the matrix may be a read-only memmap or shared view, it is read in
+    # blocks of rows and never copied as a whole
+    n = pos.shape[0]
+    stress = 0.0
+    for start in range(0, n, chunk_size):
+        stop = min(start + chunk_size, n)
+        distances = np.asarray(distance_matrix[start:stop], dtype=np.float64)
+        norms = np.linalg.norm(
+            pos[start:stop, None, :] - pos[None, :, :], axis=2
+        )
+        mask = (distances > 0) & np.isfinite(distances)
+        stress += np.sum(
+            ((norms[mask] - distances[mask]) / distances[mask]) ** 2
+        )
+
+    # each pair is counted from both of its ends
+    return stress / 2
+
+
+def pivot_stress(pos, adjacency, number_of_pivots, edge_weight, rng):
+    n = pos.shape[0]
+    k = min(number_of_pivots, n)
+    pivots = np.sort(rng.choice(n, size=k, replace=False))
+    rows = row_stresses(
+        pos=pos, adjacency=adjacency, pivots=pivots, edge_weight=edge_weight
+    )
+
+    # every pivot row stands in for n / k rows of the full matrix, and each
+    # pair is counted from both of its ends
+    stress = n / (2 * k) * rows.sum()
+    if k == n or k < 2:
+        return stress, 0.0 if k == n else np.inf
+
+    # pivots are a simple random sample of rows, so the estimate is
+    # unbiased and its standard error follows from the row spread
+    variance = (n / 2) ** 2 * (1 - k / n) * rows.var(ddof=1) / k
+
+    return stress, Z * np.sqrt(variance)
@@ -0,0 +1,92 @@
+# Third Party Library
+import numpy as np
+from scipy.spatial import ConvexHull, QhullError, cKDTree
+from scipy.spatial.distance import pdist
+
+
+def _diameter(pos):
+    # the farthest pair lies on the convex hull
+    try:
+        candidates = pos[ConvexHull(pos).vertices]
+    except (QhullError, ValueError):
+        candidates = pos
+
+    return pdist(candidates).max(initial=0.0)
+
+
+def node_resolution(pos, tree=None):
+    n = pos.shape[0]
+    r = 1 / np.sqrt(n)
+    d_max = _diameter(pos)
+    if d_max == 0:
+        return 0.0
+
+    # only pairs closer than r * d_max contribute
+    if tree is None:
+        tree = cKDTree(pos)
+    pairs = tree.query_pairs(r * d_max, output_type="ndarray")
+    d = np.linalg.norm(pos[pairs[:, 0]] - pos[pairs[:, 1]], axis=1)
+
+    return np.sum(np.maximum(r - d / d_max, 0) ** 2)
+
+
+def gabriel_graph_property(pos, edges, tree=None):
+    sources = edges[:, 0]
+    targets = edges[:, 1]
+    centers = (pos[sources] + pos[targets]) / 2
+    radii = np.linalg.norm(pos[sources] - pos[targets], axis=1) / 2
+
+    # nodes inside the disc spanned by each edge
+    if tree is None:
+        tree = cKDTree(pos)
+    inside = tree.query_ball_point(centers, radii)
+    counts = np.array([len(nodes) for nodes in inside], dtype=np.int64)
+    if counts.sum() == 0:
+        return 0.0
+    nodes = np.concatenate([np.asarray(v, dtype=np.int64) for v in inside])
+    edge_ids = np.repeat(np.arange(len(edges)), counts)
+
+    mask = (nodes != sources[edge_ids]) & (nodes != targets[edge_ids])
+    nodes = nodes[mask]
+    edge_ids = edge_ids[mask]
+    d = np.linalg.norm(pos[nodes] - centers[edge_ids], axis=1)
+
+    return np.sum(np.maximum(radii[edge_ids] - d, 0) ** 2)
+
+
+def _nearest_neighbors(tree, pos, nodes, k):
+    # the node itself is usually its own nearest neighbor, but coincident
+    # nodes can push it out of the first k + 1
+    _, neighbors = tree.query(pos[nodes], k=k + 1)
+    neighbors = neighbors.reshape(len(nodes), k + 1)
+    keep = neighbors != nodes[:, None]
+    keep[keep.all(axis=1), -1] = False
+
+    return neighbors[keep].reshape(len(nodes), k)
+
+
+def neighborhood_preservation(pos, edges, tree=None):
+    n = pos.shape[0]
+    sources = np.concatenate([edges[:, 0], edges[:, 1]])
+    targets = np.concatenate([edges[:, 1], edges[:, 0]])
+    edge_keys = np.unique(sources * n + targets)
+    degrees = np.bincount(sources, minlength=n)
+
+    # each node is compared with as many drawing neighbors as it has graph
+    # neighbors, so nodes are queried in groups of equal degree
+    if tree is None:
+        tree = cKDTree(pos)
+    intersection = 0
+    union = 0
+    for k in np.unique(degrees[degrees > 0]):
+        nodes = np.flatnonzero(degrees == k)
+        neighbors = _nearest_neighbors(tree=tree, pos=pos, nodes=nodes, k=k)
+        keys = nodes[:, None] * n + neighbors
+        shared = np.isin(keys, edge_keys).sum()
+        intersection += shared
+        union += 2 * k * len(nodes) - shared
+
+    if union == 0:
+        return 0.0
+
+    return intersection / union
@@ -0,0 +1,143 @@
+# Standard Library
+import json
+import os
+import threading
+import time
+
+_state = {"enabled": False, "events": [], "stack": []}
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span:
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+        self.start_ns = None
+        self.end_ns = None
+        self.path = name
+        self.traced = False
+
+    def start(self):
+        # a span used only as a timer, e.g. by RunTime, stays off the stack
+        # while tracing is disabled, so one that never ends leaks nothing
+        self.traced = _state["enabled"]
+        if self.traced:
+            _state["stack"].append(self.name)
+            self.path = "/".join(_state["stack"])
+        self.start_ns = time.perf_counter_ns()
+
+        return self
+
+    def end(self):
+        self.end_ns = time.perf_counter_ns()
+        if not self.traced:
+            return
+        _state["stack"].pop()
+        if not _state["enabled"]:
+            return
+
+        _state["events"].append(
+            {
+                "name": self.name,
+                "ph": "X",
+                "ts": self.start_ns / 1000,
+                "dur": (self.end_ns - self.start_ns) / 1000,
+                "pid": os.getpid(),
+                "tid": threading.get_ident(),
+                "args": {**self.args, "path": self.path},
+            }
+        )
+
+    def duration(self):
+        return (self.end_ns - self.start_ns) / 1e9
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *_):
+        self.end()
+        return False
+
+
+def enable():
+    _state["enabled"] = True
+
+
+def disable():
+    _state["enabled"] = False
+
+
+def is_enabled():
+    return _state["enabled"]
+
+
+def span(name, **args):
+    # disabled tracing costs one dict lookup per span
+    if not _state["enabled"]:
+        return _NULL_SPAN
+
+    return Span(name=name, args=args)
+
+
+def mark():
+    return len(_state["events"])
+
+
+def events(since=0):
+    return _state["events"][since:]
+
+
+def drain():
+    drained = _state["events"]
+    _state["events"] = []
+
+    return drained
+
+
+def reset():
+    # a forked worker starts with copies of the spans and events its parent
+    # had when the worker was created
+    _state["stack"] = []
+    _state["events"] = []
+
+
+def run_traced(f, **kwargs):
+    # spans recorded in a worker travel back with the result
+    enable()
+    reset()
+    result = f(**kwargs)
+
+    return result, drain()
+
+
+def add_events(worker_events):
+    # events recorded in a worker process are nested under the open spans
+    prefix = "/".join(_state["stack"])
+    for event in worker_events:
+        path = event["args"]["path"]
+        event["args"]["path"] = f"{prefix}/{path}" if prefix else path
+        _state["events"].append(event)
+
+
+def summary(since=0):
+    totals = {}
+    for event in events(since=since):
+        path = event["args"]["path"]
+        totals[path] = totals.get(path, 0) + event["dur"] / 1e6
+
+    return totals
+
+
+def export_chrome_trace(path):
+    with open(path, mode="w") as f:
+        json.dump({"traceEvents": _state["events"]}, f)
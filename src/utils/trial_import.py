@@ -0,0 +1,190 @@
+# Standard Library
+import json
+
+# Third Party Library
+import numpy as np
+import optuna
+import pandas as pd
+from optuna.distributions import distribution_to_json
+from optuna.storages import RDBStorage
+from optuna.trial import create_trial
+from sqlalchemy import func, insert, select
+
+# First Party Library
+from utils import segment_store
+
+# optuna versions whose storage tables insert_trials writes
+BULK_INSERT_VERSIONS = ["3.1"]
+
+
+def iter_frames(store_path, legacy_paths=()):
+    # one segment or legacy pickle in memory at a time
+    if store_path.exists():
+        for rows in segment_store.iter_segments(store_path, with_side=False):
+            yield pd.DataFrame(rows)
+    else:
+        for legacy_path in legacy_paths:
+            yield pd.read_pickle(legacy_path)
+
+
+def flatten(df, p_names, qm_names):
+    params = pd.DataFrame(df["params"].tolist(), index=df.index)[p_names]
+    qualities = pd.DataFrame(df["qualities"].tolist(), index=df.index)[
+        qm_names
+    ]
+
+    return params, qualities
+
+
+def user_attrs(df):
+    # the seed and every quality of a grid point, as objective.ss keeps them
+    return [
+        {"seed": int(seed), "qualities": qualities}
+        for seed, qualities in zip(df["seed"], df["qualities"])
+    ]
+
+
+def create_trials(params, values, distributions, user_attrs):
+    # optuna builds and validates every trial, insert_trials only writes them
+    mask = ~np.isnan(values)
+
+    return [
+        create_trial(
+            params=trial_params,
+            distributions=distributions,
+            value=value,
+            user_attrs=trial_user_attrs,
+        )
+        for trial_params, value, trial_user_attrs in zip(
+            params[mask].to_dict(orient="records"),
+            values[mask].tolist(),
+            [attrs for attrs, keep in zip(user_attrs, mask) if keep],
+        )
+    ]
+
+
+def supports_bulk_insert(storage):
+    version = ".".join(optuna.__version__.split(".")[:2])
+
+    return isinstance(storage, RDBStorage) and version in BULK_INSERT_VERSIONS
+
+
+def add_trials(study, study_id, trials, connection=None):
+    # study.add_trials commits every trial on its own and checks its params
+    # against the previous trials, about 60 ms a trial on sqlite or over an
+    # hour for the metric studies of one 8000 point grid, so on a connection
+    # of a storage that supports_bulk_insert the trials are written with a
+    # few executemany statements instead
+    if connection is None:
+        study.add_trials(trials)
+    else:
+        insert_trials(connection=connection, study_id=study_id, trials=trials)
+
+
+def insert_trials(connection, study_id, trials):
+    # private tables, imported here so that other optuna versions can still
+    # use add_trials
+    # Third Party Library
+    from optuna.storages._rdb.models import (
+        TrialIntermediateValueModel,
+        TrialModel,
+        TrialParamModel,
+        TrialSystemAttributeModel,
+        TrialUserAttributeModel,
+        TrialValueModel,
+    )
+
+    if len(trials) == 0:
+        return
+
+    # trials are numbered in the order they are added to their study
+    number = connection.execute(
+        select(func.count(TrialModel.trial_id)).where(
+            TrialModel.study_id == study_id
+        )
+    ).scalar_one()
+    connection.execute(
+        insert(TrialModel.__table__),
+        [
+            {
+                "number": number + i,
+                "study_id": study_id,
+                "state": trial.state,
+                "datetime_start": trial.datetime_start,
+                "datetime_complete": trial.datetime_complete,
+            }
+            for i, trial in enumerate(trials)
+        ],
+    )
+    trial_ids = (
+        connection.execute(
+            select(TrialModel.trial_id)
+            .where(TrialModel.study_id == study_id)
+            .where(TrialModel.number >= number)
+            .order_by(TrialModel.number)
+        )
+        .scalars()
+        .all()
+    )
+
+    param_records = []
+    value_records = []
+    user_attr_records = []
+    system_attr_records = []
+    intermediate_value_records = []
+    for trial_id, trial in zip(trial_ids, trials):
+        for p_name, param_value in trial.params.items():
+            distribution = trial.distributions[p_name]
+            param_records.append(
+                {
+                    "trial_id": trial_id,
+                    "param_name": p_name,
+                    "param_value": distribution.to_internal_repr(param_value),
+                    "distribution_json": distribution_to_json(distribution),
+                }
+            )
+        for objective, value in enumerate(trial.values):
+            stored_value, value_type = TrialValueModel.value_to_stored_repr(
+                value
+            )
+            value_records.append(
+                {
+                    "trial_id": trial_id,
+                    "objective": objective,
+                    "value": stored_value,
+                    "value_type": value_type,
+                }
+            )
+        for records, attrs in [
+            (user_attr_records, trial.user_attrs),
+            (system_attr_records, trial.system_attrs),
+        ]:
+            records += [
+                {"trial_id": trial_id, "key": key, "value_json": json.dumps(v)}
+                for key, v in attrs.items()
+            ]
+        for step, intermediate_value in trial.intermediate_values.items():
+            (
+                stored_value,
+                value_type,
+            ) = TrialIntermediateValueModel.intermediate_value_to_stored_repr(
+                intermediate_value
+            )
+            intermediate_value_records.append(
+                {
+                    "trial_id": trial_id,
+                    "step": step,
+                    "intermediate_value": stored_value,
+                    "intermediate_value_type": value_type,
+                }
+            )
+
+    for model, records in [
+        (TrialParamModel, param_records),
+        (TrialValueModel, value_records),
+        (TrialUserAttributeModel, user_attr_records),
+        (TrialSystemAttributeModel, system_attr_records),
+        (TrialIntermediateValueModel, intermediate_value_records),
+    ]:
+        if records:
+            connection.execute(insert(model.__table__), records)
@@ -0,0 +1,45 @@
+# Standard Library
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+# First Party Library
+from utils import tracing
+
+
+def work(seed):
+    with tracing.span("seed", seed=seed):
+        with tracing.span("sgd"):
+            pass
+
+    return seed
+
+
+def test_pool_trace_keys():
+    tracing.enable()
+    tracing.reset()
+    try:
+        with tracing.span("trial", number=0):
+            with tracing.span("evaluate", budget=100):
+                # the workers are forked while the spans above are open
+                with ProcessPoolExecutor(
+                    max_workers=2,
+                    mp_context=multiprocessing.get_context("fork"),
+                ) as executor:
+                    futures = [
+                        executor.submit(tracing.run_traced, work, seed=seed)
+                        for seed in range(4)
+                    ]
+                    for future in futures:
+                        _, worker_events = future.result()
+                        tracing.add_events(worker_events)
+
+        assert set(tracing.summary()) == {
+            "trial",
+            "trial/evaluate",
+            "trial/evaluate/seed",
+            "trial/evaluate/seed/sgd",
+        }
+        assert len(tracing.events()) == 2 + 2 * 4
+    finally:
+        tracing.disable()
+        tracing.reset()